@@ -16,13 +16,13 @@ import webview
 from bcml import DEBUG, util, _oneclick
 import bcml
 from bcml.util import Messager, LOG, SYSTEM
-from bcml._api import Api
 from bcml._server import start_server
 
 logger = None  # pylint: disable=invalid-name
 
 
 def stop_it(messager: Messager = None):
+    messager = messager or globals().get("logger")
     if messager:
         messager.save()
     try:
@@ -56,6 +56,20 @@ def configure_cef(debug):
         cache.mkdir(parents=True, exist_ok=True)
 
 
+def after_start():
+    """Runs start-up work which does not need to hold up the window"""
+    try:
+        for folder in util.get_work_dir().glob("*"):
+            rmtree(folder)
+    except (FileNotFoundError, OSError, PermissionError):
+        pass
+    _oneclick.register_handlers()
+    oneclick = Thread(target=_oneclick.listen)
+    oneclick.daemon = True
+    oneclick.start()
+    _oneclick.process_arg()
+
+
 def main(debug: bool = False):
     set_start_method("spawn", True)
     global logger  # pylint: disable=invalid-name,global-statement
@@ -65,27 +79,24 @@ def main(debug: bool = False):
         if SYSTEM != "Windows":
             os.setpgrp()
         LOG.parent.mkdir(parents=True, exist_ok=True)
-        for folder in util.get_work_dir().glob("*"):
-            rmtree(folder)
         (util.get_data_dir() / "tmp_settings.json").unlink()
     except (FileNotFoundError, OSError, PermissionError):
         pass
 
-    _oneclick.register_handlers()
-    oneclick = Thread(target=_oneclick.listen)
-    oneclick.daemon = True
-    oneclick.start()
-
+    # The server process starts up while the API and mergers are imported here
     server_port = util.get_open_port()
     server = Process(target=start_server, args=(server_port,))
     server.daemon = True
     server.start()
     host = f"http://localhost:{server_port}"
 
+    from bcml._api import Api  # pylint: disable=import-outside-toplevel
+
     api = Api(host)
 
     if not debug:
         debug = DEBUG or "bcml-debug" in sys.argv or "--debug" in sys.argv
+    util.set_verbose(debug)
 
     gui: str
     if SYSTEM == "Windows":
@@ -140,13 +151,15 @@ def main(debug: bool = False):
         min_size=(width if width == 750 else 820, 600),
     )
     logger = Messager(api.window)
+    api.logger = logger
     api.window.events.closing += stop_it
+    util.add_progress_listener(api._send_progress)  # pylint: disable=protected-access
 
     # messager = Messager(api.window)
     # with redirect_stderr(sys.stdout):
     #     with redirect_stdout(messager):  # type: ignore
     sleep(0.25)
-    webview.start(gui=gui, debug=debug, http_server=True, func=_oneclick.process_arg)
+    webview.start(gui=gui, debug=debug, http_server=True, func=after_start)
     api.cleanup()
     stop_it()  # messager=messager)
 
@@ -12,18 +12,19 @@ from pathlib import Path
 from packaging.version import Version
 from platform import system
 from subprocess import run, PIPE, Popen
-from shutil import copytree, rmtree, copyfile
+from shutil import copytree, rmtree
 from tempfile import NamedTemporaryFile, mkdtemp
 from time import sleep
 from threading import Thread
 from typing import Dict, List, Optional
+from urllib.parse import quote
 from xml.dom import minidom
 
 import requests
 import webview
 
-from bcml import DEBUG, install, dev, locks, mergers, upgrade, util
-from bcml.util import BcmlMod, LOG, SYSTEM, get_7z_path
+from bcml import DEBUG, install, dev, edits, locks, mergers, upgrade, util
+from bcml.util import BcmlMod, LOG, SYSTEM, Messager, get_7z_path
 from bcml.__version__ import USER_VERSION, VERSION
 
 
@@ -32,11 +33,15 @@ def win_or_lose(func):
         try:
             data = func(*args, **kwargs)
         except Exception as err:  # pylint: disable=broad-except
-            with LOG.open("a") as log_file:
-                log_file.write(f"\n{err}\n")
-            return {
-                "error": {"short": str(err), "error_text": traceback.format_exc(-5)}
-            }
+            error_text = traceback.format_exc(-5)
+            logger = getattr(args[0], "logger", None) if args else None
+            if logger:
+                logger.write(f"\n{traceback.format_exc()}\n")
+                error_text += "\nRecent output:\n" + "\n".join(logger.get_recent(50))
+            else:
+                with LOG.open("a") as log_file:
+                    log_file.write(f"\n{err}\n")
+            return {"error": {"short": str(err), "error_text": error_text}}
         return {"success": True, "data": data}
 
     return status_run
@@ -58,12 +63,24 @@ class Api:
     # pylint: disable=unused-argument,no-self-use,too-many-public-methods
     window: webview.Window
     host: str
+    logger: Optional[Messager] = None
     tmp_files: List[Path]
 
     def __init__(self, host: str):
         self.host = host
         self.tmp_files = []
 
+    def cancel(self, params=None):
+        return util.cancel()
+
+    def _send_progress(self, event: dict):
+        try:
+            self.window.evaluate_js(
+                f"window.onProgress && window.onProgress({json.dumps(event)})"
+            )
+        except Exception:  # pylint: disable=broad-except
+            pass
+
     def get_ver(self, params=None):
         updated = Version(util.get_settings("last_version")) < Version(VERSION)
         res = {
@@ -196,8 +213,6 @@ class Api:
 
     def save_settings(self, params):
         print("Saving settings, BCML will reload momentarily...")
-        if util.get_settings("wiiu") != params["settings"]["wiiu"]:
-            util.clear_all_caches()
         util.get_settings.settings = params["settings"]
         util.save_settings()
         from bcml.bcml import reload_settings
@@ -266,11 +281,7 @@ class Api:
     def get_mod_info(self, params):
         mod = BcmlMod.from_json(params["mod"])
         util.vprint(mod)
-        img = ""
-        try:
-            img = base64.b64encode(mod.get_preview().read_bytes()).decode("utf8")
-        except:  # pylint: disable=bare-except
-            pass
+        img = f"/thumbnail/{quote(mod.path.name)}" if mod.has_preview() else ""
         return {
             "changes": [
                 m.NAME.upper() for m in mergers.get_mergers() if m().is_mod_logged(mod)
@@ -370,6 +381,7 @@ class Api:
         }
 
     @win_or_lose
+    @util.cancellable
     @install.refresher
     def install_mod(self, params: dict):
         util.vprint(params)
@@ -416,6 +428,7 @@ class Api:
             )
 
     @win_or_lose
+    @util.cancellable
     def reprocess(self, params):
         mod = BcmlMod.from_json(params["mod"])
         rmtree(mod.path / "logs")
@@ -424,18 +437,21 @@ class Api:
         else:
             options = {}
         install.generate_logs(mod.path, options)
+        edits.save_mod_edits(mod)
 
     @win_or_lose
     @install.refresher
     def uninstall_all(self):
         for folder in {d for d in util.get_modpack_dir().glob("*") if d.is_dir()}:
             rmtree(folder, onerror=install.force_del)
+        edits.EDIT_INDEX.cache_clear()
         if not util.get_settings("no_cemu"):
             shutil.rmtree(
                 util.get_cemu_dir() / "graphicPacks" / "bcmlPatches", ignore_errors=True
             )
 
     @win_or_lose
+    @util.cancellable
     def apply_queue(self, params):
         mods = []
         for move_mod in params["moves"]:
@@ -461,6 +477,7 @@ class Api:
         install.refresh_master_export()
 
     @win_or_lose
+    @util.cancellable
     def mod_action(self, params):
         mod = BcmlMod.from_json(params["mod"])
         action = params["action"]
@@ -538,6 +555,7 @@ class Api:
         Popen(cemu_args, cwd=str(util.get_cemu_dir()))
 
     @win_or_lose
+    @util.cancellable
     @install.refresher
     def remerge(self, params):
         try:
@@ -549,11 +567,14 @@ class Api:
             if params["name"] == "all":
                 install.refresh_merges()
             else:
-                [
-                    m()
-                    for m in mergers.get_mergers()
-                    if m().friendly_name == params["name"]
-                ][0].perform_merge()
+                with install.keep_last_merge():
+                    [
+                        m()
+                        for m in mergers.get_mergers()
+                        if m().friendly_name == params["name"]
+                    ][0].perform_merge()
+        except util.Cancelled:
+            raise
         except Exception as err:  # pylint: disable=broad-except
             raise Exception(
                 f"There was an error merging your mods. {str(err)}\n"
@@ -599,12 +620,19 @@ class Api:
 
     @win_or_lose
     def delete_backup(self, params):
-        Path(params["backup"]).unlink()
+        install.delete_backup(params["backup"])
 
     @win_or_lose
-    def export(self):
+    def export(self, params=None):
         if not util.get_installed_mods():
             raise Exception("No mods installed to export.")
+        if params and params.get("folder"):
+            out = self.window.create_file_dialog(webview.FOLDER_DIALOG)
+            if out:
+                install.export(
+                    Path(out if isinstance(out, str) else out[0]), folder=True
+                )
+            return
         out = self.window.create_file_dialog(
             webview.SAVE_DIALOG,
             file_types=(
@@ -702,50 +730,7 @@ class Api:
             assert mod.exists()
         except (FileNotFoundError, IndexError, AssertionError):
             return
-        with util.TempModContext():
-            if not ((mod / "info.json").exists() or (mod / "rules.txt").exists()):
-                (mod / "info.json").write_text(
-                    json.dumps(
-                        {
-                            "name": "Temp",
-                            "desc": "Temp pack",
-                            "url": "",
-                            "id": "VGVtcD0wLjA=",
-                            "image": "",
-                            "version": "1.0.0",
-                            "depends": [],
-                            "options": {},
-                            "platform": "wiiu"
-                            if util.get_settings("wiiu")
-                            else "switch",
-                        }
-                    )
-                )
-            install.install_mod(
-                mod,
-                merge_now=True,
-                options={
-                    "options": {},
-                    "disable": [
-                        m.NAME for m in mergers.get_mergers() if m.NAME != "rstb"
-                    ],
-                },
-            )
-            (mod / util.get_content_path() / "System" / "Resource").mkdir(
-                parents=True, exist_ok=True
-            )
-            copyfile(
-                util.get_master_modpack_dir()
-                / util.get_content_path()
-                / "System"
-                / "Resource"
-                / "ResourceSizeTable.product.srsizetable",
-                mod
-                / util.get_content_path()
-                / "System"
-                / "Resource"
-                / "ResourceSizeTable.product.srsizetable",
-            )
+        dev.generate_rstb(mod)
 
     @win_or_lose
     def bnp_to_gfx(self, params=None):
@@ -773,11 +758,23 @@ class Api:
 
     def get_mod_edits(self, params=None):
         mod = BcmlMod.from_json(params["mod"])
-        edits = {}
+        mod_edits = edits.get_mod_edits(mod)
         merger_list = sorted({m() for m in mergers.get_mergers()}, key=lambda m: m.NAME)
-        for merger in merger_list:
-            edits[merger.friendly_name] = merger.get_mod_edit_info(mod)
-        return {key: sorted({str(v) for v in value}) for key, value in edits.items()}
+        return {
+            merger.friendly_name: mod_edits.get(merger.NAME, [])
+            for merger in merger_list
+        }
+
+    def get_mod_conflicts(self, params=None):
+        mod = BcmlMod.from_json(params["mod"])
+        friendly_names = {m.NAME: m().friendly_name for m in mergers.get_mergers()}
+        return {
+            friendly_names.get(merger, merger): items
+            for merger, items in edits.get_mod_conflicts(mod, disabled=True).items()
+        }
+
+    def get_conflict_matrix(self, params=None):
+        return edits.get_conflict_matrix(disabled=True)
 
     @win_or_lose
     def upgrade_bnp(self, params=None):
@@ -1,17 +1,225 @@
+import gzip
 import http.server
-import socketserver
+import mimetypes
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, NamedTuple, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
 
-from bcml.util import get_exec_dir
+import xxhash
+
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+    "font/ttf",
+    "font/otf",
+    "application/vnd.ms-fontobject",
+}
+ASSETS_DIR = Path(__file__).parent / "assets"
+# Rarely changing binary assets can be cached outright; everything else is
+# revalidated with its ETag so that updates to BCML show up immediately
+LONG_CACHE_EXTS = {".png", ".jpg", ".ico", ".woff", ".woff2", ".ttf", ".otf", ".eot"}
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("font/woff2", ".woff2")
+mimetypes.add_type("font/ttf", ".ttf")
+mimetypes.add_type("image/jpeg", ".jfif")
+
+
+class Asset(NamedTuple):
+    data: bytes
+    gzip: Optional[bytes]
+    brotli: Optional[bytes]
+    etag: str
+    content_type: str
+    mtime: int
+
+
+class Response(NamedTuple):
+    data: bytes
+    content_type: str
+    cache_control: str = "no-cache"
+
+
+ROUTES: Dict[str, Callable[[str, Dict[str, list]], Optional[Response]]] = {}
+_ASSETS: Dict[Path, Asset] = {}
+_ASSETS_LOCK = Lock()
+
+
+def route(prefix: str):
+    """
+    Registers a dynamic endpoint. The handler gets the rest of the path after the
+    prefix and the parsed query string, and returns a Response or None for a 404.
+    """
+
+    def register(func: Callable[[str, Dict[str, list]], Optional[Response]]):
+        ROUTES[prefix] = func
+        return func
+
+    return register
+
+
+def _is_compressible(content_type: str) -> bool:
+    return content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES
+
+
+def _load_asset(file: Path) -> Asset:
+    mtime = file.stat().st_mtime_ns
+    with _ASSETS_LOCK:
+        asset = _ASSETS.get(file)
+    if asset and asset.mtime == mtime:
+        return asset
+    data = file.read_bytes()
+    content_type = mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+    gzipped = brotlied = None
+    if _is_compressible(content_type) and len(data) > 1024:
+        gz_file = file.with_name(file.name + ".gz")
+        gzipped = (
+            gz_file.read_bytes()
+            if gz_file.exists() and gz_file.stat().st_mtime_ns >= mtime
+            else gzip.compress(data, 9, mtime=0)
+        )
+        br_file = file.with_name(file.name + ".br")
+        if br_file.exists() and br_file.stat().st_mtime_ns >= mtime:
+            brotlied = br_file.read_bytes()
+        elif brotli:
+            brotlied = brotli.compress(data)
+    asset = Asset(
+        data,
+        gzipped,
+        brotlied,
+        f'"{xxhash.xxh64_hexdigest(data)}"',
+        content_type,
+        mtime,
+    )
+    with _ASSETS_LOCK:
+        _ASSETS[file] = asset
+    return asset
 
 
 class BcmlRequestHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=str(get_exec_dir() / "assets"), **kwargs)
+        super().__init__(*args, directory=str(ASSETS_DIR), **kwargs)
 
     def log_message(self, format, *args):  # pylint: disable=redefined-builtin
         pass
 
+    def do_GET(self):
+        self._respond(include_body=True)
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    def _respond(self, include_body: bool):
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        for prefix, handler in ROUTES.items():
+            if path.startswith(prefix):
+                try:
+                    response = handler(path[len(prefix) :], parse_qs(url.query))
+                except Exception:  # pylint: disable=broad-except
+                    self.send_error(500)
+                    return
+                if not response:
+                    self.send_error(404)
+                    return
+                self._send(
+                    response.data,
+                    response.content_type,
+                    f'"{xxhash.xxh64_hexdigest(response.data)}"',
+                    response.cache_control,
+                    include_body,
+                )
+                return
+
+        file = Path(self.translate_path(path))
+        if file.is_dir():
+            file = file / "index.html"
+        try:
+            asset = _load_asset(file)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            self.send_error(404)
+            return
+        cache_control = (
+            "public, max-age=86400" if file.suffix in LONG_CACHE_EXTS else "no-cache"
+        )
+        encodings = self.headers.get("Accept-Encoding", "")
+        if asset.brotli and "br" in encodings:
+            data, encoding = asset.brotli, "br"
+        elif asset.gzip and "gzip" in encodings:
+            data, encoding = asset.gzip, "gzip"
+        else:
+            data, encoding = asset.data, None
+        self._send(
+            data,
+            asset.content_type,
+            asset.etag if not encoding else f'{asset.etag[:-1]}-{encoding}"',
+            cache_control,
+            include_body,
+            encoding,
+            vary=bool(asset.gzip or asset.brotli),
+        )
+
+    def _send(
+        self,
+        data: bytes,
+        content_type: str,
+        etag: str,
+        cache_control: str,
+        include_body: bool,
+        encoding: Optional[str] = None,
+        vary: bool = False,
+    ):
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if vary:
+            self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        if include_body:
+            self.wfile.write(data)
+
+
+@route("/thumbnail/")
+def _thumbnail(mod_id: str, _query: Dict[str, list]) -> Optional[Response]:
+    # the server process only loads BCML itself once a thumbnail is requested
+    from bcml import util  # pylint: disable=import-outside-toplevel
+
+    if not mod_id or "/" in mod_id or "\\" in mod_id or mod_id.startswith("."):
+        return None
+    mod_dir = util.get_modpack_dir() / mod_id
+    if not (mod_dir / "info.json").exists():
+        return None
+    try:
+        thumb = util.get_mod_thumbnail(util.BcmlMod(mod_dir))
+    except (FileNotFoundError, KeyError, IndexError, ValueError, OSError):
+        return None
+    return Response(
+        thumb.read_bytes(), mimetypes.guess_type(thumb.name)[0] or "image/png"
+    )
+
 
 def start_server(port: int):
-    with socketserver.TCPServer(("", port), BcmlRequestHandler) as httpd:
+    with http.server.ThreadingHTTPServer(("", port), BcmlRequestHandler) as httpd:
+        httpd.daemon_threads = True
         httpd.serve_forever()
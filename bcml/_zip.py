@@ -0,0 +1,194 @@
+"""Provides a streaming ZIP writer which compresses entries in parallel"""
+# Licensed under GPLv3+
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Tuple
+
+# Payloads which are already compressed and would gain nothing from deflate
+STORED_MAGICS = (b"Yaz0", b"PK\x03\x04", b"7z\xbc\xaf", b"\x89PNG", b"\xff\xd8\xff")
+ZIP64_LIMIT = 0xFFFFFFFF
+
+
+class _Entry(NamedTuple):
+    name: bytes
+    data: bytes
+    crc: int
+    size: int
+    method: int
+    dos_time: int
+    dos_date: int
+    mode: int
+
+
+class _Record(NamedTuple):
+    entry: _Entry
+    offset: int
+
+
+def _dos_datetime(mtime: float) -> Tuple[int, int]:
+    stamp = datetime.fromtimestamp(max(mtime, 315532800))
+    return (
+        stamp.hour << 11 | stamp.minute << 5 | stamp.second // 2,
+        (stamp.year - 1980) << 9 | stamp.month << 5 | stamp.day,
+    )
+
+
+def _load_entry(file: Path, arcname: str, level: int) -> _Entry:
+    data = file.read_bytes()
+    stat = file.stat()
+    crc = zlib.crc32(data)
+    size = len(data)
+    method = 0
+    if size and not data.startswith(STORED_MAGICS):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        packed = compressor.compress(data) + compressor.flush()
+        if len(packed) < size:
+            data, method = packed, 8
+    return _Entry(
+        arcname.encode("utf-8"),
+        data,
+        crc,
+        size,
+        method,
+        *_dos_datetime(stat.st_mtime),
+        stat.st_mode & 0xFFFF,
+    )
+
+
+def _zip64_extra(*values: int) -> bytes:
+    return struct.pack(f"<HH{len(values)}Q", 0x0001, 8 * len(values), *values)
+
+
+def _write_local(out, entry: _Entry, offset: int) -> _Record:
+    zip64 = entry.size >= ZIP64_LIMIT or len(entry.data) >= ZIP64_LIMIT
+    extra = _zip64_extra(entry.size, len(entry.data)) if zip64 else b""
+    out.write(
+        struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50,
+            45 if zip64 else 20,
+            0x0800,
+            entry.method,
+            entry.dos_time,
+            entry.dos_date,
+            entry.crc,
+            ZIP64_LIMIT if zip64 else len(entry.data),
+            ZIP64_LIMIT if zip64 else entry.size,
+            len(entry.name),
+            len(extra),
+        )
+    )
+    out.write(entry.name)
+    out.write(extra)
+    out.write(entry.data)
+    return _Record(entry._replace(data=b""), offset)
+
+
+def _write_central(out, record: _Record, csize: int):
+    entry = record.entry
+    big_sizes = entry.size >= ZIP64_LIMIT or csize >= ZIP64_LIMIT
+    big_offset = record.offset >= ZIP64_LIMIT
+    zip64_values = [entry.size, csize] if big_sizes else []
+    if big_offset:
+        zip64_values.append(record.offset)
+    extra = _zip64_extra(*zip64_values) if zip64_values else b""
+    out.write(
+        struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50,
+            45 | 3 << 8,
+            45 if zip64_values else 20,
+            0x0800,
+            entry.method,
+            entry.dos_time,
+            entry.dos_date,
+            entry.crc,
+            ZIP64_LIMIT if big_sizes else csize,
+            ZIP64_LIMIT if big_sizes else entry.size,
+            len(entry.name),
+            len(extra),
+            0,
+            0,
+            0,
+            entry.mode << 16,
+            ZIP64_LIMIT if big_offset else record.offset,
+        )
+    )
+    out.write(entry.name)
+    out.write(extra)
+
+
+def write_zip(
+    output: Path,
+    files: Iterable[Tuple[Path, str]],
+    level: int = 6,
+    workers: int = 0,
+):
+    """
+    Writes files into a new ZIP archive, deflating them on a thread pool and writing
+    them out in order as they finish. Payloads which are already compressed, such as
+    Yaz0 files, are stored as-is.
+
+    :param output: The path of the ZIP file to create
+    :param files: Pairs of each file to add and its name inside the archive
+    :param level: The deflate compression level to use
+    :param workers: The number of compression threads, defaults to the CPU count
+    """
+    workers = workers or min(63, os.cpu_count() or 1)
+    records: List[Tuple[_Record, int]] = []
+    with output.open("wb") as out, ThreadPoolExecutor(workers) as executor:
+        pending = []
+        queue = iter(files)
+
+        def fill():
+            for file, arcname in queue:
+                pending.append(executor.submit(_load_entry, file, arcname, level))
+                if len(pending) >= workers * 2:
+                    break
+
+        fill()
+        while pending:
+            entry = pending.pop(0).result()
+            records.append((_write_local(out, entry, out.tell()), len(entry.data)))
+            del entry
+            fill()
+        cd_offset = out.tell()
+        for record, csize in records:
+            _write_central(out, record, csize)
+        cd_size = out.tell() - cd_offset
+        count = len(records)
+        if count >= 0xFFFF or cd_offset >= ZIP64_LIMIT or cd_size >= ZIP64_LIMIT:
+            eocd64_offset = out.tell()
+            out.write(
+                struct.pack(
+                    "<IQHHIIQQQQ",
+                    0x06064B50,
+                    44,
+                    45 | 3 << 8,
+                    45,
+                    0,
+                    0,
+                    count,
+                    count,
+                    cd_size,
+                    cd_offset,
+                )
+            )
+            out.write(struct.pack("<IIQI", 0x07064B50, 0, eocd64_offset, 1))
+        out.write(
+            struct.pack(
+                "<IHHHHIIH",
+                0x06054B50,
+                0,
+                0,
+                min(count, 0xFFFF),
+                min(count, 0xFFFF),
+                min(cd_size, ZIP64_LIMIT),
+                min(cd_offset, ZIP64_LIMIT),
+                0,
+            )
+        )
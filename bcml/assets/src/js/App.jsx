@@ -46,6 +46,7 @@ class App extends React.Component {
             showProgress: false,
             progressStatus: "",
             progressTitle: "",
+            progressPhases: {},
             showConfirm: false,
             confirmText: "",
             confirmCallback: () => {},
@@ -87,6 +88,12 @@ class App extends React.Component {
         window.onMsg = msg => {
             this.setState({ progressStatus: msg });
         };
+        window.onProgress = event => {
+            const phases = { ...this.state.progressPhases };
+            if (event.event == "phase_end") delete phases[event.phase];
+            else phases[event.phase] = event;
+            this.setState({ progressPhases: phases });
+        };
 
         document.addEventListener("keyup", e => {
             try {
@@ -389,6 +396,7 @@ class App extends React.Component {
         this.setState({
             progressTitle: title,
             progressStatus: msg || "",
+            progressPhases: {},
             showProgress: true
         });
     };
@@ -519,6 +527,7 @@ class App extends React.Component {
                     show={this.state.showProgress}
                     title={this.state.progressTitle}
                     status={this.state.progressStatus}
+                    phases={this.state.progressPhases}
                 />
                 <DoneDialog
                     show={this.state.showDone}
@@ -66,12 +66,13 @@ class ModInfo extends React.Component {
                                     (this.props.mod.name.includes("NSFW") ||
                                     this.props.mod.name.includes("THICC")
                                         ? "https://i.imgur.com/AfedhPe.png"
-                                        : this.state.image
-                                        ? "data:image/*;charset=utf-8;base64," +
-                                          this.state.image
-                                        : null)) ||
+                                        : this.state.image || null)) ||
                                 "logo-smaller.png"
                             }
+                            onError={e => {
+                                e.target.onerror = null;
+                                e.target.src = "logo-smaller.png";
+                            }}
                             className="mod-preview"
                         />
                         <div className="mod-preview-shadow"></div>
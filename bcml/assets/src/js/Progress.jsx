@@ -1,4 +1,4 @@
-import { Modal, Spinner } from "react-bootstrap";
+import { Button, Modal, ProgressBar, Spinner } from "react-bootstrap";
 
 import React from "react";
 
@@ -117,12 +117,23 @@ class ProgressModal extends React.Component {
         super(props);
         this.timer = null;
         this.state = {
-            messageIdx: 0
+            messageIdx: 0,
+            cancelling: false
         };
     }
 
+    cancel = () => {
+        this.setState({ cancelling: true }, async () => {
+            // Only installs and merges can be cancelled; anything else just runs on
+            if (!(await pywebview.api.cancel())) {
+                this.setState({ cancelling: false });
+            }
+        });
+    };
+
     componentDidUpdate(prevProps) {
         if (!prevProps.show && this.props.show) {
+            this.setState({ cancelling: false });
             shuffle(messages);
             this.timer = setInterval(() => {
                 if (this.props.show) {
@@ -140,6 +151,9 @@ class ProgressModal extends React.Component {
     }
 
     render() {
+        const bars = Object.values(this.props.phases || {}).filter(
+            phase => phase.percent != null
+        );
         return (
             <Modal centered show={this.props.show}>
                 <Modal.Header>
@@ -164,6 +178,25 @@ class ProgressModal extends React.Component {
                                     : "")
                         }}></div>
                 </Modal.Body>
+                <Modal.Footer className="d-block">
+                    {bars.map(phase => (
+                        <ProgressBar
+                            key={phase.phase}
+                            className="my-1"
+                            now={phase.percent}
+                            label={`${phase.label} ${Math.round(phase.percent)}%`}
+                        />
+                    ))}
+                    <div className="d-flex justify-content-end">
+                        <Button
+                            size="sm"
+                            variant="secondary"
+                            disabled={this.state.cancelling}
+                            onClick={this.cancel}>
+                            {this.state.cancelling ? "Cancelling…" : "Cancel"}
+                        </Button>
+                    </div>
+                </Modal.Footer>
             </Modal>
         );
     }
@@ -0,0 +1,352 @@
+"""Provides a headless command-line interface to BCML's mod management"""
+# Licensed under GPLv3+
+import argparse
+import json
+import os
+import sys
+import traceback
+from contextlib import nullcontext
+from pathlib import Path
+from time import time
+from typing import List, Optional, TextIO
+
+from bcml import util
+
+
+class JsonProgress:
+    """
+    A stand-in for stdout which turns everything BCML prints into JSON lines
+    events, so that scripts and CI jobs can follow progress without scraping text.
+    """
+
+    def __init__(self, out: TextIO):
+        self._out = out
+        self._buffer = ""
+
+    def emit(self, event: str, **data):
+        self._out.write(json.dumps({"event": event, "time": time(), **data}) + "\n")
+        self._out.flush()
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                self.emit("log", message=line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def _find_mod(key: str) -> util.BcmlMod:
+    mods = util.get_installed_mods(disabled=True)
+    for mod in mods:
+        if key in {mod.name, mod.path.name, mod.id, str(mod.priority)}:
+            return mod
+    matches = [mod for mod in mods if key.lower() in mod.name.lower()]
+    if len(matches) == 1:
+        return matches[0]
+    raise ValueError(
+        f"No installed mod matches {key}"
+        if not matches
+        else f"{key} matches more than one mod: {', '.join(m.name for m in matches)}"
+    )
+
+
+def _list(args, progress: Optional[JsonProgress]):
+    mods = util.get_installed_mods(disabled=True)
+    if progress:
+        progress.emit("mods", mods=[mod.to_json() for mod in mods])
+        return
+    for mod in mods:
+        print(
+            f"{mod.priority:>4}  {mod.name}"
+            + (" (disabled)" if mod.disabled else "")
+        )
+
+
+def _install(args, _progress):
+    from bcml import install  # pylint: disable=import-outside-toplevel
+
+    options = json.loads(args.options) if args.options else {}
+    options.setdefault("options", {})
+    options.setdefault("disable", [])
+    with util.start_pool() as pool:
+        for mod in args.mods:
+            install.install_mod(Path(mod), options=options, pool=pool)
+        print(f"Installed {len(args.mods)} mods")
+        if not args.no_merge:
+            try:
+                install.refresh_merges()
+            except Exception:  # pylint: disable=broad-except
+                pool.terminate()
+                raise
+    install.refresh_master_export()
+
+
+def _mod_action(args, _progress):
+    from bcml import install  # pylint: disable=import-outside-toplevel
+
+    action = {
+        "enable": install.enable_mod,
+        "disable": install.disable_mod,
+        "uninstall": install.uninstall_mod,
+    }[args.command]
+    for key in args.mods:
+        action(_find_mod(key), wait_merge=True)
+    if util.get_installed_mods() and not args.no_merge:
+        install.refresh_merges()
+    install.refresh_master_export()
+
+
+def _reorder(args, _progress):
+    from bcml import install  # pylint: disable=import-outside-toplevel
+
+    mods = [_find_mod(key) for key in args.mods]
+    rest = [
+        mod
+        for mod in util.get_installed_mods(disabled=True)
+        if mod.path not in {m.path for m in mods}
+    ]
+    # mods not named keep their relative order below the ones that were
+    for priority, mod in enumerate(rest + mods[::-1], start=100):
+        if mod.priority != priority:
+            mod.change_priority(priority)
+    if not args.no_merge:
+        install.refresh_merges()
+    install.refresh_master_export()
+
+
+def _remerge(args, _progress):
+    # pylint: disable=import-outside-toplevel
+    from bcml import install, mergers
+
+    if not util.get_installed_mods():
+        print("No mods installed, nothing to merge")
+        return
+    if not args.merger:
+        install.refresh_merges()
+    else:
+        names = {name.lower() for name in args.merger}
+        selected = [
+            merger()
+            for merger in mergers.get_mergers()
+            if merger.NAME.lower() in names
+            or merger().friendly_name.lower() in names
+        ]
+        if not selected:
+            raise ValueError(f"No merger matches {', '.join(args.merger)}")
+        with install.keep_last_merge(), util.start_pool() as pool:
+            for merger in mergers.sort_mergers(selected):
+                merger.set_pool(pool)
+                with util.progress_phase(merger.NAME, label=merger.friendly_name):
+                    merger.perform_merge()
+    install.refresh_master_export()
+
+
+def _export(args, _progress):
+    from bcml import install  # pylint: disable=import-outside-toplevel
+
+    if not util.get_installed_mods():
+        raise ValueError("No mods installed to export.")
+    install.export(Path(args.output), standalone=args.standalone, folder=args.folder)
+
+
+def _gen_rstb(args, _progress):
+    from bcml import dev  # pylint: disable=import-outside-toplevel
+
+    folder = Path(args.folder)
+    if not folder.is_dir():
+        raise FileNotFoundError(f"{folder} is not a folder")
+    dev.generate_rstb(folder)
+
+
+def _conflicts(args, progress: Optional[JsonProgress]):
+    from bcml import edits  # pylint: disable=import-outside-toplevel
+
+    if args.mod:
+        mod = _find_mod(args.mod)
+        conflicts = edits.get_mod_conflicts(mod, disabled=True)
+        if progress:
+            progress.emit("conflicts", mod=mod.name, conflicts=conflicts)
+            return
+        if not conflicts:
+            print(f"No other mod edits anything {mod.name} edits")
+        for merger, items in sorted(conflicts.items()):
+            print(f"{merger}:")
+            for item, mods in sorted(items.items()):
+                print(f"  {item}: {', '.join(mods)}")
+        return
+    matrix = edits.get_conflict_matrix(disabled=True)
+    if progress:
+        progress.emit("conflict_matrix", **matrix)
+        return
+    for name, row in zip(matrix["mods"], matrix["matrix"]):
+        print(f"{name}: " + " ".join(f"{count:>5}" for count in row))
+
+
+def _print_phase_time(event: dict):
+    if event["event"] == "phase_end":
+        print(f"{event['label']} finished in {event['elapsed']:.2f} seconds")
+
+
+def _print_cache_stats():
+    for name, stats in util.get_cache_stats().items():
+        if stats["hits"] or stats["misses"]:
+            print(
+                f"{name}: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['size']} entries"
+            )
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="bcml-cli", description="Manage BCML mods without the GUI"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print progress as JSON lines events"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Print verbose output"
+    )
+    parser.add_argument(
+        "--settings",
+        help="A JSON file of settings to override for this run only",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        help="Cancel the command if it runs longer than this many seconds, "
+        "saving a trace of where the time went",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List installed mods").set_defaults(func=_list)
+
+    install_cmd = commands.add_parser("install", help="Install one or more mods")
+    install_cmd.add_argument("mods", nargs="+", help="Mod files or folders")
+    install_cmd.add_argument(
+        "--options", help='Install options as JSON, e.g. {"disable": ["texts"]}'
+    )
+    install_cmd.set_defaults(func=_install)
+
+    for action in ("uninstall", "enable", "disable"):
+        action_cmd = commands.add_parser(action, help=f"{action.title()} mods")
+        action_cmd.add_argument(
+            "mods", nargs="+", help="Mod names, folder names, IDs, or priorities"
+        )
+        action_cmd.set_defaults(func=_mod_action)
+
+    reorder_cmd = commands.add_parser(
+        "reorder", help="Reorder mods, highest priority first"
+    )
+    reorder_cmd.add_argument(
+        "mods", nargs="+", help="Mods in order from highest to lowest priority"
+    )
+    reorder_cmd.set_defaults(func=_reorder)
+
+    remerge_cmd = commands.add_parser("remerge", help="Remerge installed mods")
+    remerge_cmd.add_argument(
+        "--merger",
+        action="append",
+        help="Only run the named merger (may be given more than once)",
+    )
+    remerge_cmd.set_defaults(func=_remerge)
+
+    export_cmd = commands.add_parser("export", help="Export the merged mods")
+    export_cmd.add_argument("output", help="The .zip or .bnp file to create")
+    export_cmd.add_argument(
+        "--standalone", action="store_true", help="Export a standalone mod"
+    )
+    export_cmd.add_argument(
+        "--folder",
+        action="store_true",
+        help="Export to a folder, e.g. on an SD card, copying only changed files",
+    )
+    export_cmd.set_defaults(func=_export)
+
+    conflicts_cmd = commands.add_parser(
+        "conflicts", help="Show which mods edit the same files, actors, flags, etc."
+    )
+    conflicts_cmd.add_argument(
+        "mod",
+        nargs="?",
+        help="Show the conflicts of only this mod instead of a matrix of all mods",
+    )
+    conflicts_cmd.set_defaults(func=_conflicts)
+
+    rstb_cmd = commands.add_parser("gen-rstb", help="Generate an RSTB for a mod")
+    rstb_cmd.add_argument("folder", help="The mod folder")
+    rstb_cmd.set_defaults(func=_gen_rstb)
+
+    for cmd in (install_cmd, reorder_cmd) + tuple(
+        commands.choices[a] for a in ("uninstall", "enable", "disable")
+    ):
+        cmd.add_argument(
+            "--no-merge", action="store_true", help="Skip remerging afterwards"
+        )
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = _get_parser().parse_args(argv)
+    util.set_verbose(args.verbose)
+    progress: Optional[JsonProgress] = None
+    if args.json:
+        # Keep the real stdout for events and send everything written straight to
+        # the file descriptor, like output from worker processes, to stderr
+        sys.stdout.flush()
+        progress = JsonProgress(os.fdopen(os.dup(1), "w", encoding="utf-8"))
+        os.dup2(2, 1)
+        sys.stdout = progress  # type: ignore
+        util.add_progress_listener(lambda event: progress.emit(**event))
+    elif args.verbose:
+        util.add_progress_listener(_print_phase_time)
+
+    settings = (
+        util.TempSettingsContext(
+            json.loads(Path(args.settings).read_text("utf-8"))
+        )
+        if args.settings
+        else nullcontext()
+    )
+    try:
+        with settings, util.CancelContext(args.budget):
+            args.func(args, progress)
+    except util.Cancelled as err:
+        if progress:
+            progress.emit("cancelled", error=str(err))
+        else:
+            print(f"Cancelled: {err}", file=sys.stderr)
+        return 2
+    except Exception as err:  # pylint: disable=broad-except
+        if progress:
+            progress.emit(
+                "error",
+                error=str(err),
+                error_type=type(err).__name__,
+                traceback=traceback.format_exc(),
+            )
+        else:
+            print(
+                f"Error: {err}"
+                + (f"\n{traceback.format_exc()}" if args.verbose else ""),
+                file=sys.stderr,
+            )
+        return 1
+    if args.verbose:
+        if progress:
+            progress.emit("cache_stats", caches=util.get_cache_stats())
+        else:
+            _print_cache_stats()
+    if progress:
+        progress.emit("done", command=args.command)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 # pylint: disable=unsupported-assignment-operation,no-member
-import multiprocessing
+import os
 import shutil
 import subprocess
 from base64 import urlsafe_b64encode
@@ -10,17 +10,58 @@ from multiprocessing import Pool
 from pathlib import Path
 from platform import system
 from tempfile import TemporaryDirectory
-from typing import Optional, Union, List, Tuple
+from time import time
+from typing import Callable, Dict, Optional, Union, List, Tuple
 from zlib import crc32
 
 import oead
 import xxhash  # pylint: disable=wrong-import-order
 
-from bcml import util, install
+from bcml import util, install, mergers
 from bcml.util import BYML_EXTS, SARC_EXTS, TempSettingsContext
 from bcml.mergers.pack import SPECIAL
 
 EXCLUDE_EXTS = {".yml", ".yaml", ".bak", ".txt", ".json", ".old", ".bnp"}
+BUILD_CACHE_DAYS = 30
+
+
+def get_build_cache_dir() -> Path:
+    return util.get_data_dir() / "bnp_cache"
+
+
+def _prune_build_cache(cache_dir: Path):
+    cutoff = time() - BUILD_CACHE_DAYS * 86400
+    for kind in {"yml", "sarc", "logs"}:
+        if not (cache_dir / kind).exists():
+            continue
+        for entry in (cache_dir / kind).iterdir():
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    if entry.is_dir():
+                        shutil.rmtree(entry)
+                    else:
+                        entry.unlink()
+            except OSError:
+                continue
+
+
+def _read_build_cache(entry: Path) -> Optional[bytes]:
+    try:
+        data = entry.read_bytes()
+    except FileNotFoundError:
+        return None
+    entry.touch()
+    return data
+
+
+def _write_build_cache(entry: Path, data: bytes):
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp_entry = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+    tmp_entry.write_bytes(data)
+    try:
+        tmp_entry.replace(entry)
+    except OSError:
+        tmp_entry.unlink()
 
 
 def _yml_to_byml(file: Path):
@@ -64,7 +105,12 @@ def _package_code(tmp_dir: Path, meta: dict):
         )
 
 
-def _pack_sarcs(tmp_dir: Path, hashes: dict, pool: multiprocessing.pool.Pool):
+def _pack_sarcs(
+    tmp_dir: Path,
+    hashes: dict,
+    pool: util.Executor,
+    cache_dir: Optional[Path] = None,
+):
     sarc_folders = {
         d
         for d in tmp_dir.rglob("**/*")
@@ -76,7 +122,10 @@ def _pack_sarcs(tmp_dir: Path, hashes: dict, pool: multiprocessing.pool.Pool):
         )
     }
     if sarc_folders:
-        pool.map(partial(_pack_sarc, hashes=hashes, tmp_dir=tmp_dir), sarc_folders)
+        pool.map(
+            partial(_pack_sarc, hashes=hashes, tmp_dir=tmp_dir, cache_dir=cache_dir),
+            sarc_folders,
+        )
     pack_folders = {
         d
         for d in tmp_dir.rglob("**/*")
@@ -85,10 +134,37 @@ def _pack_sarcs(tmp_dir: Path, hashes: dict, pool: multiprocessing.pool.Pool):
         and d.suffix == ".pack"
     }
     if pack_folders:
-        pool.map(partial(_pack_sarc, hashes=hashes, tmp_dir=tmp_dir), pack_folders)
+        pool.map(
+            partial(_pack_sarc, hashes=hashes, tmp_dir=tmp_dir, cache_dir=cache_dir),
+            pack_folders,
+        )
 
 
-def _pack_sarc(folder: Path, tmp_dir: Path, hashes: dict):
+def _get_sarc_cache_key(folder: Path, tmp_dir: Path) -> str:
+    hasher = xxhash.xxh3_128()
+    hasher.update(
+        f"{folder.relative_to(tmp_dir).as_posix()}:{util.get_settings('wiiu')}".encode(
+            "utf8"
+        )
+    )
+    for file in sorted(f for f in folder.rglob("**/*") if f.is_file()):
+        hasher.update(f"\n{file.relative_to(folder).as_posix()}:".encode("utf8"))
+        hasher.update(xxhash.xxh3_128_digest(file.read_bytes()))
+    return hasher.hexdigest()
+
+
+def _pack_sarc(
+    folder: Path, tmp_dir: Path, hashes: dict, cache_dir: Optional[Path] = None
+):
+    cache_entry: Optional[Path] = None
+    if cache_dir:
+        cache_entry = cache_dir / "sarc" / _get_sarc_cache_key(folder, tmp_dir)
+        cached = _read_build_cache(cache_entry)
+        if cached is not None:
+            shutil.rmtree(folder)
+            if cached:
+                folder.write_bytes(cached)
+            return
     packed = oead.SarcWriter(
         endian=oead.Endianness.Big
         if util.get_settings("wiiu")
@@ -116,30 +192,35 @@ def _pack_sarc(folder: Path, tmp_dir: Path, hashes: dict):
             if f.is_file() and not f.suffix in EXCLUDE_EXTS
         }:
             file_data = file.read_bytes()
-            xhash = xxhash.xxh64_intdigest(util.unyaz_if_needed(file_data))
             file_name = file.relative_to(folder).as_posix()
             if file_name in old_files:
-                old_hash = xxhash.xxh64_intdigest(
-                    util.unyaz_if_needed(old_sarc.get_file(file_name).data)
-                )
-            if file_name not in old_files or (xhash != old_hash):
-                packed.files[file_name] = file_data
+                old_data = old_sarc.get_file(file_name).data
+                # a different decompressed size settles it without decompressing
+                size = util.get_decompressed_size(file_data)
+                if size == util.get_decompressed_size(old_data) and (
+                    xxhash.xxh64_intdigest(util.unyaz_if_needed(file_data))
+                    == xxhash.xxh64_intdigest(util.unyaz_if_needed(old_data))
+                ):
+                    continue
+            packed.files[file_name] = file_data
     finally:
         shutil.rmtree(folder)
         if not packed.files:
+            if cache_entry:
+                _write_build_cache(cache_entry, b"")
             return  # pylint: disable=lost-exception
         sarc_bytes = packed.write()[1]
-        folder.write_bytes(
-            util.compress(sarc_bytes)
-            if (folder.suffix.startswith(".s") and not folder.suffix == ".sarc")
-            else sarc_bytes
-        )
+        if folder.suffix.startswith(".s") and not folder.suffix == ".sarc":
+            sarc_bytes = util.compress(sarc_bytes)
+        folder.write_bytes(sarc_bytes)
+        if cache_entry:
+            _write_build_cache(cache_entry, sarc_bytes)
 
 
 CLEAN_EXTS = util.SARC_EXTS - {".beventpack", ".sbeventpack"}
 
 
-def _clean_sarcs(tmp_dir: Path, hashes: dict, pool: multiprocessing.pool.Pool):
+def _clean_sarcs(tmp_dir: Path, hashes: dict, pool: util.Executor):
     sarc_files = {
         file
         for file in tmp_dir.rglob("**/*")
@@ -249,18 +330,38 @@ def _clean_sarc_file(file: Path, hashes: dict, tmp_dir: Path):
         )
 
 
-def _do_yml(file: Path):
+def _do_yml(file: Path, cache_dir: Optional[Path] = None):
     out = file.with_suffix("")
     if out.exists():
         return
+    if out.suffix not in util.AAMP_EXTS and out.suffix not in util.BYML_EXTS:
+        return
+    cache_entry: Optional[Path] = None
+    if cache_dir:
+        hasher = xxhash.xxh3_128(file.read_bytes())
+        hasher.update(f"{out.suffix}:{util.get_settings('wiiu')}".encode("utf8"))
+        cache_entry = cache_dir / "yml" / hasher.hexdigest()
+        cached = _read_build_cache(cache_entry)
+        if cached is not None:
+            out.write_bytes(cached)
+            file.unlink()
+            return
     if out.suffix in util.AAMP_EXTS:
         _yml_to_aamp(file)
-    elif out.suffix in util.BYML_EXTS:
+    else:
         _yml_to_byml(file)
+    if cache_entry:
+        _write_build_cache(cache_entry, out.read_bytes())
 
 
-def _make_bnp_logs(tmp_dir: Path, options: dict):
-    util.vprint(install.generate_logs(tmp_dir, options=options))
+def _make_bnp_logs(tmp_dir: Path, options: dict, cache_dir: Optional[Path] = None):
+    util.vprint(
+        install.generate_logs(
+            tmp_dir,
+            options=options,
+            log_cache=cache_dir / "logs" if cache_dir else None,
+        )
+    )
 
     print("Removing unnecessary files...")
 
@@ -285,6 +386,10 @@ def _make_bnp_logs(tmp_dir: Path, options: dict):
         ):
             bootup_lang.unlink()
 
+    if (tmp_dir / "logs" / "texts").is_dir():
+        # the per-language split of texts.json is rebuilt from it when installed
+        shutil.rmtree(tmp_dir / "logs" / "texts")
+
     if (tmp_dir / "logs" / "actorinfo.yml").exists() and (
         tmp_dir / util.get_content_path() / "Actor" / "ActorInfo.product.sbyml"
     ).exists():
@@ -372,17 +477,22 @@ def create_bnp_mod(mod: Path, output: Path, meta: dict, options: Optional[dict]
 
     _package_code(tmp_dir, meta)
 
+    cache_dir: Optional[Path] = None
+    if util.get_settings("bnp_build_cache"):
+        cache_dir = get_build_cache_dir()
+        _prune_build_cache(cache_dir)
+
     with util.start_pool() as pool:
         yml_files = set(tmp_dir.glob("**/*.yml"))
         if yml_files:
             print("Compiling YAML documents...")
-            pool.map(_do_yml, yml_files)
+            pool.map(partial(_do_yml, cache_dir=cache_dir), yml_files)
 
         hashes = util.get_hash_table(util.get_settings("wiiu"))
         print("Packing SARCs...")
-        _pack_sarcs(tmp_dir, hashes, pool)
+        _pack_sarcs(tmp_dir, hashes, pool, cache_dir)
         for folder in {d for d in tmp_dir.glob("options/*") if d.is_dir()}:
-            _pack_sarcs(folder, hashes, pool)
+            _pack_sarcs(folder, hashes, pool, cache_dir)
 
         for option_dir in tmp_dir.glob("options/*"):
             for file in {
@@ -406,9 +516,9 @@ def create_bnp_mod(mod: Path, output: Path, meta: dict, options: Optional[dict]
         options["options"]["texts"] = {"all_langs": True}
 
         try:
-            _make_bnp_logs(tmp_dir, options)
+            _make_bnp_logs(tmp_dir, options, cache_dir)
             for option_dir in {d for d in tmp_dir.glob("options/*") if d.is_dir()}:
-                _make_bnp_logs(option_dir, options)
+                _make_bnp_logs(option_dir, options, cache_dir)
         except Exception as err:  # pylint: disable=broad-except
             pool.terminate()
             raise Exception(
@@ -479,6 +589,11 @@ NO_CONVERT_EXTS = {
     ".sbmapopen",
     ".sbmaptex",
 }
+STRING_PARAM_TYPES = (
+    oead.FixedSafeString32,
+    oead.FixedSafeString64,
+    oead.FixedSafeString256,
+)
 
 
 def _convert_actorpack(actor_pack: Path, to_wiiu: bool) -> Union[None, str]:
@@ -526,6 +641,12 @@ def _convert_actorpack(actor_pack: Path, to_wiiu: bool) -> Union[None, str]:
     return error
 
 
+def _convert_byml(data: bytes, to_wiiu: bool, compressed: bool) -> bytes:
+    byml = oead.byml.from_binary(util.unyaz_if_needed(data))
+    new_bytes = oead.byml.to_binary(byml, big_endian=to_wiiu)
+    return util.compress(new_bytes) if compressed else new_bytes
+
+
 def _convert_sarc_file(pack: Path, to_wiiu: bool) -> list:
     data = pack.read_bytes()
     if not data:
@@ -551,14 +672,15 @@ def _convert_sarc(sarc: oead.Sarc, to_wiiu: bool) -> Tuple[bytes, List[str]]:
                 f"This mod contains a file not supported by the converter: {file.name}"
             )
         elif ext in BYML_EXTS:
-            byml = oead.byml.from_binary(util.unyaz_if_needed(file.data))
-            data = oead.byml.to_binary(byml, big_endian=to_wiiu)
-            if ext.startswith(".s"):
-                data = util.compress(data)
-            new_sarc.files[file.name] = data
-        elif ext in SARC_EXTS and ext not in NO_CONVERT_EXTS:
-            nest = oead.Sarc(util.unyaz_if_needed(file.data))
-            new_bytes, errs = _convert_sarc(nest, to_wiiu)
+            new_sarc.files[file.name] = _convert_byml(
+                file.data, to_wiiu, ext.startswith(".s")
+            )
+        elif ext in SARC_EXTS:
+            # each nested layer is decompressed, converted and recompressed once,
+            # on its way back up into its parent
+            new_bytes, errs = _convert_sarc(
+                oead.Sarc(util.unyaz_if_needed(file.data)), to_wiiu
+            )
             new_sarc.files[file.name] = (
                 new_bytes
                 if not (ext.startswith(".s") and ext != ".sarc")
@@ -568,44 +690,60 @@ def _convert_sarc(sarc: oead.Sarc, to_wiiu: bool) -> Tuple[bytes, List[str]]:
     return new_sarc.write()[1], error
 
 
-def convert_mod(mod: Path, to_wiiu: bool, warn_only: bool = False) -> list:
-    warnings = []
+def _convert_file(file: Path, to_wiiu: bool) -> List[str]:
+    if file.suffix == ".sbactorpack":
+        error = _convert_actorpack(file, to_wiiu)
+        return [error] if error else []
+    if file.suffix in SARC_EXTS:
+        return _convert_sarc_file(file, to_wiiu)
+    file.write_bytes(
+        _convert_byml(file.read_bytes(), to_wiiu, file.suffix.startswith(".s"))
+    )
+    return []
+
+
+def _convert_aamp_log(
+    pio: oead.aamp.ParameterIO, fix_path: Callable[[str], str]
+) -> oead.aamp.ParameterIO:
+    # Logs keep their file paths as string parameters in the top-level objects and
+    # key their diff lists by the same paths, so both are rewritten together.
+    renamed: Dict[int, str] = {}
+    new_pio = oead.aamp.ParameterIO()
+    new_pio.type = pio.type
+    new_pio.version = pio.version
+    for obj_key, obj in pio.objects.items():
+        new_obj = oead.aamp.ParameterObject()
+        for param_key, param in obj.params.items():
+            value = param.v
+            if not isinstance(value, (str, *STRING_PARAM_TYPES)):
+                new_obj.params[param_key] = param
+                continue
+            old_path = str(value)
+            new_path = fix_path(old_path)
+            if new_path != old_path:
+                renamed[crc32(old_path.encode("utf-8"))] = new_path
+            if param_key.hash == crc32(old_path.encode("utf-8")):
+                param_key = new_path
+            new_obj.params[param_key] = oead.aamp.Parameter(
+                new_path if isinstance(value, str) else type(value)(new_path)
+            )
+        new_pio.objects[obj_key] = new_obj
+    for list_key, plist in pio.lists.items():
+        new_pio.lists[renamed.get(list_key.hash, list_key)] = plist
+    return new_pio
 
-    def handle_warning(warning: Union[str, list]) -> None:
-        if not warn_only:
-            raise ValueError(warning)
-        elif isinstance(warning, list):
-            for warning_ in warning:
-                warnings.append(warning_)
-        else:
-            warnings.append(warning)
 
-    to_content: str
-    from_content: str
-    to_aoc: str
-    from_aoc: str
-    if to_wiiu:
-        to_content = "content"
-        from_content = "01007EF00011E000/romfs"
-        to_aoc = "aoc/0010"
-        from_aoc = "01007EF00011F001/romfs"
-    else:
-        to_content = "01007EF00011E000/romfs"
-        from_content = "content"
-        to_aoc = "01007EF00011F001/romfs"
-        from_aoc = "aoc/0010"
+def _get_convert_paths(to_wiiu: bool) -> Tuple[str, str, str, str]:
+    wiiu_paths = ("content", "aoc/0010")
+    switch_paths = ("01007EF00011E000/romfs", "01007EF00011F001/romfs")
+    from_paths, to_paths = (
+        (switch_paths, wiiu_paths) if to_wiiu else (wiiu_paths, switch_paths)
+    )
+    return from_paths[0], to_paths[0], from_paths[1], to_paths[1]
 
-    special_files = {"ActorInfo.product.sbyml"}
-    all_files = {
-        f for f in mod.rglob("*.*") if f.is_file() and f not in (mod / "options").rglob("*.*")
-    }
 
-    for file in all_files:
-        if file.suffix in NO_CONVERT_EXTS:
-            handle_warning(
-                "This mod contains a file which the platform converter does not support:"
-                f" {str(file.relative_to(mod)) if 'options' not in mod.parts else str(file.relative_to(mod.parent))}"
-            )
+def _convert_logs(mod: Path, to_wiiu: bool, handle_warning: Callable):
+    from_content, to_content, from_aoc, to_aoc = _get_convert_paths(to_wiiu)
 
     actorinfo_log = mod / "logs" / "actorinfo.yml"
     if actorinfo_log.exists():
@@ -730,79 +868,158 @@ def convert_mod(mod: Path, to_wiiu: bool, warn_only: bool = False) -> list:
                 "utf-8",
             )
 
+    def fix_path(path: str) -> str:
+        return (
+            path.replace("\\", "/")
+            .replace(from_content, to_content)
+            .replace(from_aoc, to_aoc)
+        )
+
     for log in {"deepmerge.aamp", "shop.aamp", "aslist.aamp"}:
         log_path = mod / "logs" / log
         if log_path.exists():
             pio = oead.aamp.ParameterIO.from_binary(log_path.read_bytes())
-            if "deepmerge" in log:
-                table = oead.aamp.get_default_name_table()
-                for i in range(len(pio.objects["FileTable"].params)):
-                    table.add_name(f"File{i}")
-            text = pio.to_text().replace("\\\\", "/").replace("\\", "/")
-            log_path.write_bytes(
-                oead.aamp.ParameterIO.from_text(
-                    text.replace(from_content, to_content).replace(from_aoc, to_aoc)
-                ).to_binary()
-            )
+            log_path.write_bytes(_convert_aamp_log(pio, fix_path).to_binary())
 
-    for file in {
-        f for f in all_files if f.suffix in BYML_EXTS and f.name not in special_files
-    }:
-        byml = oead.byml.from_binary(util.unyaz_if_needed(file.read_bytes()))
-        data = oead.byml.to_binary(byml, big_endian=to_wiiu)
-        if file.suffix.startswith(".s"):
-            data = util.compress(data)
-        file.write_bytes(data)
 
-    with util.start_pool() as pool:
-        errs = pool.map(
-            partial(_convert_actorpack, to_wiiu=to_wiiu),
-            {f for f in all_files if f.suffix == ".sbactorpack"},
-        )
-        for err in errs:
-            if err:
-                handle_warning(err)
+def _get_convert_folders(mod: Path) -> List[Path]:
+    folders = [mod]
+    if (mod / "options").exists():
+        folders.extend(sorted(d for d in (mod / "options").glob("*") if d.is_dir()))
+    return folders
 
-        errs = pool.map(
-            partial(_convert_sarc_file, to_wiiu=to_wiiu),  # type: ignore
-            {
-                f
-                for f in all_files
-                if f.suffix in SARC_EXTS
-                if f.suffix != ".sbactorpack"
-            },
-        )
-        for err in errs:
-            if err:
-                handle_warning(err)
 
-        if (mod / from_content).exists():
-            shutil.move(mod / from_content, mod / to_content)  # type: ignore
+def convert_mod(mod: Path, to_wiiu: bool, warn_only: bool = False) -> list:
+    """
+    Converts a mod and all of its option folders between Wii U and Switch formats.
+    Every file which needs converting, across all option folders, is queued on one
+    shared pool, largest first.
+
+    :param mod: The root folder of the mod
+    :param to_wiiu: Whether to convert to Wii U (True) or Switch (False)
+    :param warn_only: Collect problems as warnings instead of raising on the first
+    :return: A list of warnings about files which could not be converted
+    """
+    warnings = []
+
+    def handle_warning(warning: Union[str, list]) -> None:
+        if not warn_only:
+            raise ValueError(warning)
+        elif isinstance(warning, list):
+            for warning_ in warning:
+                warnings.append(warning_)
+        else:
+            warnings.append(warning)
 
-        if (mod / from_aoc).exists():
-            shutil.move(mod / from_aoc, mod / to_aoc)  # type: ignore
+    from_content, to_content, from_aoc, to_aoc = _get_convert_paths(to_wiiu)
 
-        with TempSettingsContext({"wiiu": to_wiiu}):
-            rstb_log = mod / "logs" / "rstb.json"
-            if rstb_log.exists():
-                # pylint: disable=import-outside-toplevel
-                rstb_log.unlink()
-                from bcml.install import find_modded_files
-                from bcml.mergers.rstable import RstbMerger
+    special_files = {"ActorInfo.product.sbyml"}
+    folders = _get_convert_folders(mod)
+    jobs: List[Path] = []
+    for folder in folders:
+        all_files = {
+            f
+            for f in folder.rglob("*.*")
+            if f.is_file() and "options" not in f.relative_to(folder).parts
+        }
+        for file in all_files:
+            if file.suffix in NO_CONVERT_EXTS:
+                handle_warning(
+                    "This mod contains a file which the platform converter does not "
+                    f"support: {file.relative_to(mod).as_posix()}"
+                )
+        _convert_logs(folder, to_wiiu, handle_warning)
+        jobs.extend(
+            f
+            for f in all_files
+            if f.suffix in SARC_EXTS
+            or (f.suffix in BYML_EXTS and f.name not in special_files)
+        )
+    jobs.sort(key=lambda f: f.stat().st_size, reverse=True)
 
-                files = find_modded_files(mod, pool)
+    with util.start_pool() as pool:
+        for errs in pool.imap_unordered(
+            partial(_convert_file, to_wiiu=to_wiiu), jobs
+        ):
+            if errs:
+                handle_warning(errs)
+
+        for folder in folders:
+            if (folder / from_content).exists():
+                shutil.move(folder / from_content, folder / to_content)  # type: ignore
+
+            if (folder / from_aoc).exists():
+                shutil.move(folder / from_aoc, folder / to_aoc)  # type: ignore
+
+    rstb_folders = [f for f in folders if (f / "logs" / "rstb.json").exists()]
+    if rstb_folders:
+        # pylint: disable=import-outside-toplevel
+        from bcml.install import find_modded_files
+        from bcml.mergers.rstable import RstbMerger
+
+        # the pool is started inside the context so its workers use the new platform
+        with TempSettingsContext({"wiiu": to_wiiu}), util.start_pool() as pool:
+            for folder in rstb_folders:
+                (folder / "logs" / "rstb.json").unlink()
+                files = find_modded_files(folder, pool, save_index=False)
                 merger = RstbMerger()
                 merger.set_pool(pool)
-                merger.log_diff(mod, files)
+                merger.log_diff(folder, files)
 
-    if (mod / "options").exists():
-        for folder in {d for d in (mod / "options").glob("*") if d.is_dir()}:
-            option_warnings = convert_mod(folder, to_wiiu=to_wiiu, warn_only=warn_only)
-            handle_warning(option_warnings)
-    
     if (mod / "info.json").exists():
         meta = loads((mod / "info.json").read_text("utf-8"))
         meta["platform"] = "wiiu" if to_wiiu else "switch"
         (mod / "info.json").write_text(dumps(meta, indent=2, ensure_ascii=False), "utf-8")
 
     return warnings
+
+
+def generate_rstb(mod: Path):
+    """
+    Generates an RSTB for a mod folder by installing it in a temporary mod context
+    with only the RSTB merger enabled, then copies the merged table into the folder.
+    """
+    with util.TempModContext():
+        if not ((mod / "info.json").exists() or (mod / "rules.txt").exists()):
+            (mod / "info.json").write_text(
+                dumps(
+                    {
+                        "name": "Temp",
+                        "desc": "Temp pack",
+                        "url": "",
+                        "id": "VGVtcD0wLjA=",
+                        "image": "",
+                        "version": "1.0.0",
+                        "depends": [],
+                        "options": {},
+                        "platform": "wiiu"
+                        if util.get_settings("wiiu")
+                        else "switch",
+                    }
+                )
+            )
+        install.install_mod(
+            mod,
+            merge_now=True,
+            options={
+                "options": {},
+                "disable": [
+                    m.NAME for m in mergers.get_mergers() if m.NAME != "rstb"
+                ],
+            },
+        )
+        (mod / util.get_content_path() / "System" / "Resource").mkdir(
+            parents=True, exist_ok=True
+        )
+        shutil.copyfile(
+            util.get_master_modpack_dir()
+            / util.get_content_path()
+            / "System"
+            / "Resource"
+            / "ResourceSizeTable.product.srsizetable",
+            mod
+            / util.get_content_path()
+            / "System"
+            / "Resource"
+            / "ResourceSizeTable.product.srsizetable",
+        )
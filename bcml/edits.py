@@ -0,0 +1,230 @@
+"""Provides an index of which installed mods edit which files, actors, flags, etc."""
+# Licensed under GPLv3+
+import json
+from itertools import combinations
+from threading import RLock
+from typing import Dict, List, Optional, Set
+
+from bcml import util
+
+EDITS_FILE = ".bcml_edits.json"
+
+# merger name -> edited item -> folder names of the mods which edit it
+EditIndex = Dict[str, Dict[str, List[str]]]
+
+
+def _get_log_signature(mod: util.BcmlMod) -> List[list]:
+    return sorted(list(entry) for entry in util.get_tree_signature(mod.path / "logs"))
+
+
+def _load_mod_edits(mod: util.BcmlMod) -> Optional[Dict[str, List[str]]]:
+    try:
+        saved = json.loads((mod.path / EDITS_FILE).read_text("utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    if saved.get("version") != util.VERSION or saved.get(
+        "logs"
+    ) != _get_log_signature(mod):
+        return None
+    return saved["edits"]
+
+
+def save_mod_edits(mod: util.BcmlMod) -> Dict[str, List[str]]:
+    """
+    Collects what a mod edits from each merger's logs and saves it in the mod folder.
+    This is done at install time, so that later queries do not have to parse logs.
+    """
+    from bcml import mergers  # pylint: disable=import-outside-toplevel
+
+    edits = {}
+    for merger in [merger_class() for merger_class in mergers.get_mergers()]:
+        if not merger.is_mod_logged(mod):
+            continue
+        try:
+            items = merger.get_mod_edit_info(mod)
+        except (NotImplementedError, FileNotFoundError, KeyError, ValueError) as err:
+            util.vprint(f"Could not get {merger.NAME} edits for {mod.name}: {err}")
+            continue
+        if items:
+            edits[merger.NAME] = sorted({str(item) for item in items})
+    try:
+        util.replace_file(
+            mod.path / EDITS_FILE,
+            json.dumps(
+                {
+                    "version": util.VERSION,
+                    "logs": _get_log_signature(mod),
+                    "edits": edits,
+                }
+            ),
+        )
+    except OSError:
+        pass
+    EDIT_INDEX.update(mod.id, edits)
+    return edits
+
+
+def _read_mod_edits(mod: util.BcmlMod) -> Dict[str, List[str]]:
+    edits = _load_mod_edits(mod)
+    if edits is None:
+        edits = save_mod_edits(mod)
+    return edits
+
+
+class EditIndexCache:
+    """
+    The inverted index of installed mods' edits, kept up to date in place: a mod's
+    entry is replaced whenever its edits are saved and dropped when it is
+    uninstalled. Entries are keyed by mod ID, which survives reordering. Mods not seen
+    yet, e.g. after a restart, are added from their saved edit lists when queried.
+    """
+
+    name = "edit_index"
+    settings = frozenset({"store_dir", "wiiu"})
+    _mods: Dict[str, Dict[str, List[str]]]
+    _index: Dict[str, Dict[str, Set[str]]]
+
+    def __init__(self):
+        self._mods = {}
+        self._index = {}
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, mod_id: str, edits: Dict[str, List[str]]):
+        with self._lock:
+            self._remove(mod_id)
+            self._mods[mod_id] = edits
+            for merger, items in edits.items():
+                merger_index = self._index.setdefault(merger, {})
+                for item in items:
+                    merger_index.setdefault(item, set()).add(mod_id)
+
+    def remove(self, mod_id: str):
+        with self._lock:
+            self._remove(mod_id)
+
+    def _remove(self, mod_id: str):
+        for merger, items in self._mods.pop(mod_id, {}).items():
+            merger_index = self._index.get(merger, {})
+            for item in items:
+                holders = merger_index.get(item)
+                if holders is not None:
+                    holders.discard(mod_id)
+                    if not holders:
+                        del merger_index[item]
+
+    def get_mod(self, mod: util.BcmlMod) -> Dict[str, List[str]]:
+        """Gets the items a mod edits for each merger, loading them if not indexed"""
+        with self._lock:
+            edits = self._mods.get(mod.id)
+            if edits is not None:
+                self.hits += 1
+                return edits
+            self.misses += 1
+        edits = _read_mod_edits(mod)
+        self.update(mod.id, edits)
+        return edits
+
+    def lookup(self, mods: List[util.BcmlMod], merger: str, item: str) -> List[str]:
+        """Gets the IDs of the given mods which edit an item, in their given order"""
+        with self._lock:
+            holders = self._index.get(merger, {}).get(item, set())
+            return [mod.id for mod in mods if mod.id in holders]
+
+    def get_index(self, mods: List[util.BcmlMod]) -> EditIndex:
+        for mod in mods:
+            self.get_mod(mod)
+        order = {mod.id: i for i, mod in enumerate(mods)}
+        folders = {mod.id: mod.path.name for mod in mods}
+        index: EditIndex = {}
+        with self._lock:
+            for merger, items in self._index.items():
+                for item, holders in items.items():
+                    present = sorted(
+                        (h for h in holders if h in order), key=order.__getitem__
+                    )
+                    if present:
+                        index.setdefault(merger, {})[item] = [
+                            folders[h] for h in present
+                        ]
+        return index
+
+    def cache_clear(self):
+        with self._lock:
+            self._mods.clear()
+            self._index.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._mods),
+            "settings": sorted(self.settings),
+        }
+
+
+EDIT_INDEX = util.CACHES.register(EditIndexCache())
+
+
+def get_mod_edits(mod: util.BcmlMod) -> Dict[str, List[str]]:
+    """
+    Gets the items a mod edits for each merger, from the edit index, or else from its
+    saved edit list if that is still current, or else by rebuilding it from its logs
+    """
+    return EDIT_INDEX.get_mod(mod)
+
+
+def forget_mod_edits(mod: util.BcmlMod):
+    """Drops an uninstalled mod from the edit index"""
+    EDIT_INDEX.remove(mod.id)
+
+
+def get_edit_index(disabled: bool = False) -> EditIndex:
+    """
+    Gets the inverted index of installed mods' edits, as the folder names of the mods
+    which edit each item, in priority order
+    """
+    return EDIT_INDEX.get_index(util.get_installed_mods(disabled))
+
+
+def get_mod_conflicts(
+    mod: util.BcmlMod, disabled: bool = False
+) -> Dict[str, Dict[str, List[str]]]:
+    """Gets the other mods which edit each item this mod edits, by merger"""
+    mods = util.get_installed_mods(disabled)
+    for other in mods:
+        EDIT_INDEX.get_mod(other)
+    names = {m.id: m.name for m in mods}
+    conflicts: Dict[str, Dict[str, List[str]]] = {}
+    for merger, items in get_mod_edits(mod).items():
+        for item in items:
+            others = [
+                names[other]
+                for other in EDIT_INDEX.lookup(mods, merger, item)
+                if other != mod.id
+            ]
+            if others:
+                conflicts.setdefault(merger, {})[item] = others
+    return conflicts
+
+
+def get_conflict_matrix(disabled: bool = False) -> dict:
+    """
+    Counts the items each pair of installed mods both edit. Returns the mod names in
+    priority order and a symmetric matrix of counts, with each mod's total edits on
+    the diagonal.
+    """
+    index = get_edit_index(disabled)
+    mods = util.get_installed_mods(disabled)
+    positions = {mod.path.name: i for i, mod in enumerate(mods)}
+    matrix = [[0] * len(mods) for _ in mods]
+    for merger_index in index.values():
+        for folders in merger_index.values():
+            slots = sorted(positions[f] for f in folders if f in positions)
+            for slot in slots:
+                matrix[slot][slot] += 1
+            for first, second in combinations(slots, 2):
+                matrix[first][second] += 1
+                matrix[second][first] += 1
+    return {"mods": [mod.name for mod in mods], "matrix": matrix}
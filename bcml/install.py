@@ -5,24 +5,26 @@
 import datetime
 import errno
 import json
-import multiprocessing
 import os
 import re
 import shutil
 import stat
 import subprocess
+import zlib
+from contextlib import contextmanager
 from functools import partial
 from multiprocessing import Pool
 from pathlib import Path
 from platform import system
 from shutil import rmtree, copyfile
 from tempfile import TemporaryDirectory, mkdtemp
-from typing import List, Union, Callable, Dict, Any, Optional
+from typing import List, Union, Callable, Dict, Any, Optional, Iterator
 from xml.dom import minidom
 
 import oead
+import xxhash
 
-from bcml import util, mergers, dev, upgrade
+from bcml import util, mergers, dev, edits, upgrade, _zip
 from bcml import bcml as rsext
 from bcml.util import SYSTEM, BcmlMod, get_7z_path
 
@@ -136,7 +138,11 @@ def _check_modded(file: Path, tmp_dir: Path):
     except ValueError:
         util.vprint(f"Ignored unknown file {file.relative_to(tmp_dir).as_posix()}")
         return None
-    if util.is_file_modded(canon, file, True):
+    try:
+        game_file: Optional[Path] = util.get_game_file(file.relative_to(tmp_dir))
+    except FileNotFoundError:
+        game_file = None
+    if util.is_file_modded(canon, file, True, game_file):
         util.vprint(f"Found modded file {canon}")
         return file
     else:
@@ -146,10 +152,12 @@ def _check_modded(file: Path, tmp_dir: Path):
         return None
 
 
+SCAN_INDEX = ".bcml_scan.json"
+
+
 def find_modded_files(
-    tmp_dir: Path, pool: Optional[multiprocessing.pool.Pool] = None
+    tmp_dir: Path, pool: Optional[util.Executor] = None, save_index: bool = True
 ) -> List[Union[Path, str]]:
-    modded_files = []
     if isinstance(tmp_dir, str):
         tmp_dir = Path(tmp_dir)
 
@@ -189,18 +197,168 @@ def find_modded_files(
                 ex_out.write_bytes(file.data)
         aoc_field.write_bytes(b"")
 
-    modded_files = [
-        f if "//" in f else Path(f)
-        for f in rsext.find_modified_files(str(tmp_dir))
+    return _scan_modded_files(tmp_dir, save_index)
+
+
+def _load_scan_index(tmp_dir: Path) -> Dict[str, dict]:
+    try:
+        index = json.loads((tmp_dir / SCAN_INDEX).read_text("utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if index.get("version") != util.VERSION or index.get("wiiu") != util.get_settings(
+        "wiiu"
+    ):
+        return {}
+    return index["files"]
+
+
+def _scan_modded_files(tmp_dir: Path, save_index: bool) -> List[Union[Path, str]]:
+    """
+    Finds modified files and nested files using a sidecar index (.bcml_scan.json) of
+    the last scan, so that only files whose size and modified time (or, failing that,
+    hash) changed since then are read and checked again. Without save_index, as when
+    convert_mod re-logs a folder in place, the index is read but not written.
+    """
+    roots = (f"{util.get_content_path()}/", f"{util.get_dlc_path()}/")
+    signature = {
+        file: (size, mtime)
+        for file, size, mtime in util.get_tree_signature(tmp_dir)
+        if file.startswith(roots)
+    }
+    old_index = _load_scan_index(tmp_dir)
+    index: Dict[str, dict] = {}
+    to_scan: List[str] = []
+    for file, (size, mtime) in signature.items():
+        entry = old_index.get(file)
+        if entry and entry["size"] == size and (
+            entry["mtime"] == mtime or entry["hash"] == _hash_file(tmp_dir / file)
+        ):
+            index[file] = {**entry, "mtime": mtime}
+        else:
+            to_scan.append(file)
+
+    if to_scan:
+        if len(to_scan) < len(signature):
+            util.vprint(f"Rescanning {len(to_scan)} changed files")
+        # The scanner does not report per-file progress, so the phase only marks
+        # when the scan starts and ends. It hashes each file as it reads it, so none
+        # is read twice.
+        with util.progress_phase("scan", label="Scanning files"):
+            results, hashes = rsext.find_modified_files_in(str(tmp_dir), to_scan)
+        for file in to_scan:
+            size, mtime = signature[file]
+            index[file] = {
+                "size": size,
+                "mtime": mtime,
+                "hash": hashes.get(file, ""),
+                "modded": False,
+                "nested": [],
+            }
+        for result in results:
+            if "//" in result:
+                index[result.split("//")[0]]["nested"].append(result)
+            else:
+                index[Path(result).relative_to(tmp_dir).as_posix()]["modded"] = True
+
+    if save_index and index != old_index:
+        try:
+            util.replace_file(
+                tmp_dir / SCAN_INDEX,
+                json.dumps(
+                    {
+                        "version": util.VERSION,
+                        "wiiu": util.get_settings("wiiu"),
+                        "files": index,
+                    }
+                ),
+            )
+        except OSError:
+            pass
+
+    modded_files: List[Union[Path, str]] = [
+        tmp_dir / file for file, entry in index.items() if entry["modded"]
     ]
+    modded_files.extend(
+        nested for entry in index.values() for nested in entry["nested"]
+    )
     return modded_files
 
 
+def _get_log_cache_key(
+    tmp_dir: Path,
+    merger: mergers.Merger,
+    options: dict,
+    modded_files: List[Union[Path, str]],
+    file_hashes: Dict[Path, str],
+) -> str:
+    hasher = xxhash.xxh3_128()
+    hasher.update(
+        json.dumps(
+            [merger.NAME, options, util.get_settings("wiiu"), util.VERSION],
+            sort_keys=True,
+            default=str,
+        ).encode("utf8")
+    )
+    # nested files are keyed on the pack that contains them
+    sources = {
+        file if isinstance(file, Path) else tmp_dir / file.split("//")[0]
+        for file in merger.get_log_inputs(modded_files)
+    }
+    for source in sorted(sources):
+        if source not in file_hashes:
+            file_hashes[source] = _hash_file(source) if source.is_file() else ""
+        hasher.update(
+            f"{source.relative_to(tmp_dir).as_posix()}:{file_hashes[source]}\n".encode(
+                "utf8"
+            )
+        )
+    return hasher.hexdigest()
+
+
+def _restore_cached_logs(log_dir: Path, entry: Path) -> bool:
+    if not (entry / ".done").exists():
+        return False
+    for file in entry.rglob("*"):
+        if file.is_file() and file.name != ".done":
+            out = log_dir / file.relative_to(entry)
+            out.parent.mkdir(parents=True, exist_ok=True)
+            copyfile(file, out)
+    entry.touch()
+    return True
+
+
+def _save_cached_logs(log_dir: Path, before: frozenset, entry: Path):
+    changed = {item[0] for item in util.get_tree_signature(log_dir) - before}
+    tmp_entry = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+    rmtree(tmp_entry, ignore_errors=True)
+    tmp_entry.mkdir(parents=True)
+    for file in changed:
+        out = tmp_entry / file
+        out.parent.mkdir(parents=True, exist_ok=True)
+        copyfile(log_dir / file, out)
+    (tmp_entry / ".done").write_bytes(b"")
+    rmtree(entry, ignore_errors=True)
+    try:
+        tmp_entry.rename(entry)
+    except OSError:
+        rmtree(tmp_entry, ignore_errors=True)
+
+
 def generate_logs(
     tmp_dir: Path,
     options: dict = None,
-    pool: Optional[multiprocessing.pool.Pool] = None,
+    pool: Optional[util.Executor] = None,
+    log_cache: Optional[Path] = None,
 ) -> List[Union[Path, str]]:
+    """
+    Scans a mod for modified files and has each merger log its changes.
+
+    :param tmp_dir: The root folder of the mod to log
+    :param options: Merger options and disabled mergers
+    :param pool: An existing pool to use, if any
+    :param log_cache: A folder in which to cache each merger's logs, keyed by the
+    files that merger reads, so that mergers with unchanged inputs can be skipped
+    """
     if isinstance(tmp_dir, str):
         tmp_dir = Path(tmp_dir)
     if not options:
@@ -229,20 +387,40 @@ def generate_logs(
         raise RuntimeError(message)
 
     (tmp_dir / "logs").mkdir(parents=True, exist_ok=True)
+    file_hashes: Dict[Path, str] = {}
     try:
         for i, merger_class in enumerate(
-            [
-                merger_class
-                for merger_class in mergers.get_mergers()
-                if merger_class.NAME not in options["disable"]
-            ]
+            util.progress_iter(
+                "logs",
+                [
+                    merger_class
+                    for merger_class in mergers.get_mergers()
+                    if merger_class.NAME not in options["disable"]
+                ],
+                "Logging changes",
+            )
         ):
             merger = merger_class()  # type: ignore
             util.vprint(f"Merger {merger.NAME}, #{i+1} of {len(mergers.get_mergers())}")
             if options is not None and merger.NAME in options["options"]:
                 merger.set_options(options["options"][merger.NAME])
             merger.set_pool(this_pool)
+            if not log_cache:
+                merger.log_diff(tmp_dir, modded_files)
+                continue
+            entry = log_cache / _get_log_cache_key(
+                tmp_dir,
+                merger,
+                options["options"].get(merger.NAME, {}),
+                modded_files,
+                file_hashes,
+            )
+            if _restore_cached_logs(tmp_dir / "logs", entry):
+                util.vprint(f"Reusing cached logs for {merger.NAME}")
+                continue
+            before = util.get_tree_signature(tmp_dir / "logs")
             merger.log_diff(tmp_dir, modded_files)
+            _save_cached_logs(tmp_dir / "logs", before, entry)
         if util.get_settings("strip_gfx"):
             dev._clean_sarcs(
                 tmp_dir, util.get_hash_table(util.get_settings("wiiu")), this_pool
@@ -279,7 +457,7 @@ def install_mod(
     mod: Path,
     options: dict = None,
     selects: dict = None,
-    pool: Optional[multiprocessing.pool.Pool] = None,
+    pool: Optional[util.Executor] = None,
     insert_priority: int = 0,
     merge_now: bool = False,
     updated: bool = False,
@@ -314,7 +492,7 @@ def install_mod(
     if not options:
         options = {"options": {}, "disable": []}
 
-    this_pool: Optional[multiprocessing.pool.Pool] = None  # type: ignore
+    this_pool: Optional[util.Executor] = None  # type: ignore
     try:
         rules = json.loads((tmp_dir / "info.json").read_text("utf-8"))
         mod_name = rules["name"].strip(" '\"").replace("_", "")
@@ -367,6 +545,13 @@ def install_mod(
             generate_logs(tmp_dir=tmp_dir, options=options, pool=this_pool)
             if not util.get_settings("strip_gfx"):
                 (tmp_dir / ".processed").touch()
+        # last chance to stop before the mod folder and priorities are touched
+        util.check_cancelled()
+    except util.Cancelled:
+        if this_pool and not pool:
+            this_pool.terminate()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
     except Exception as err:  # pylint: disable=broad-except
         try:
             name = mod_name
@@ -483,9 +668,13 @@ def install_mod(
         )
 
         output_mod = BcmlMod(mod_dir)
+        try:
+            edits.save_mod_edits(output_mod)
+        except Exception:  # pylint: disable=broad-except
+            util.vprint(f"Could not index the edits in {mod_name}")
         try:
             util.get_mod_link_meta(rules)
-            util.get_mod_preview(output_mod)
+            util.prefetch_thumbnail(output_mod)
         except Exception:  # pylint: disable=broad-except
             pass
     except Exception as err:  # pylint: disable=broad-except
@@ -498,12 +687,16 @@ def install_mod(
 
     try:
         if merge_now:
-            for merger in [m() for m in mergers.get_mergers()]:
-                if this_pool or pool:
-                    merger.set_pool(this_pool or pool)
-                if merger.NAME in options["options"]:
-                    merger.set_options(options["options"][merger.NAME])
-                merger.perform_merge()
+            with keep_last_merge():
+                for merger in [m() for m in mergers.get_mergers()]:
+                    util.check_cancelled()
+                    if this_pool or pool:
+                        merger.set_pool(this_pool or pool)
+                    if merger.NAME in options["options"]:
+                        merger.set_options(options["options"][merger.NAME])
+                    merger.perform_merge()
+    except util.Cancelled:
+        raise
     except Exception as err:  # pylint: disable=broad-except
         raise util.MergeError(err) from err
 
@@ -565,12 +758,18 @@ def uninstall_mod(mod: BcmlMod, wait_merge: bool = False):
             "and try again. The location of the folder is "
             f"<code>{str(mod.path)}</code>."
         ) from err
+    edits.forget_mod_edits(mod)
 
     for fall_mod in [
         m for m in util.get_installed_mods(True) if m.priority > mod.priority
     ]:
         fall_mod.change_priority(fall_mod.priority - 1)
 
+    try:
+        util.prune_thumbnails()
+    except OSError:
+        pass
+
     if not util.get_installed_mods():
         shutil.rmtree(util.get_master_modpack_dir())
         util.create_bcml_graphicpack_if_needed()
@@ -590,16 +789,93 @@ def uninstall_mod(mod: BcmlMod, wait_merge: bool = False):
     print(f"{mod.name} has been uninstalled.")
 
 
+@contextmanager
+def keep_last_merge(fresh: bool = False) -> Iterator[None]:
+    """
+    Sets the last merge aside while mergers run, and puts it back if they are
+    cancelled or fail partway through, so that a half-written merge never replaces
+    it. With fresh, the mergers start from an empty merged folder, as for a full
+    refresh. Otherwise they update a copy of the last merge, which is copied rather
+    than linked because mergers rewrite their files in place.
+    """
+    master = util.get_master_modpack_dir()
+    backup = util.get_modpack_dir().with_name(
+        f"{util.get_modpack_dir().name}_merge_backup"
+    )
+    shutil.rmtree(backup, True)
+    if fresh:
+        try:
+            master.rename(backup)
+        except OSError:
+            shutil.rmtree(master, True)
+    elif master.exists():
+        shutil.copytree(master, backup, symlinks=True)
+    try:
+        yield
+    except BaseException:
+        if backup.exists():
+            print("Restoring previous merge...")
+            shutil.rmtree(master, True)
+            backup.rename(master)
+        raise
+    shutil.rmtree(backup, True)
+
+
 def refresh_merges():
     print("Cleansing old merges...")
-    shutil.rmtree(util.get_master_modpack_dir(), True)
-    print("Refreshing merged mods...")
-    with util.start_pool() as pool:
-        for merger in mergers.sort_mergers(
-            [merger_class() for merger_class in mergers.get_mergers()]
-        ):
-            merger.set_pool(pool)
-            merger.perform_merge()
+    with keep_last_merge(fresh=True):
+        print("Refreshing merged mods...")
+        with util.start_pool() as pool:
+            for merger in util.progress_iter(
+                "merge",
+                mergers.sort_mergers(
+                    [merger_class() for merger_class in mergers.get_mergers()]
+                ),
+                "Merging mods",
+            ):
+                merger.set_pool(pool)
+                with util.progress_phase(merger.NAME, label=merger.friendly_name):
+                    merger.perform_merge()
+
+
+BACKUP_EXT = ".bcbak"
+BACKUP_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def get_backup_dir() -> Path:
+    return util.get_storage_dir() / "backups"
+
+
+def _get_blob_path(blob: str) -> Path:
+    return get_backup_dir() / "blobs" / blob[0:2] / blob
+
+
+def _store_backup_file(file: Path) -> List[str]:
+    blobs = []
+    with file.open("rb") as b_file:
+        for chunk in iter(partial(b_file.read, BACKUP_CHUNK_SIZE), b""):
+            blob = xxhash.xxh3_128_hexdigest(chunk)
+            blob_path = _get_blob_path(blob)
+            if not blob_path.exists():
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                packed = zlib.compress(chunk, 1)
+                tmp_path = blob_path.with_suffix(".tmp")
+                if len(packed) < len(chunk) * 0.95:
+                    tmp_path.write_bytes(b"\x01" + packed)
+                else:
+                    tmp_path.write_bytes(b"\x00" + chunk)
+                tmp_path.replace(blob_path)
+            blobs.append(blob)
+    return blobs
+
+
+def _load_backup_blob(blob: str) -> bytes:
+    data = _get_blob_path(blob).read_bytes()
+    return zlib.decompress(data[1:]) if data[0] == 1 else data[1:]
+
+
+def _load_backup_manifest(manifest: Path) -> Dict[str, dict]:
+    return json.loads(manifest.read_text("utf-8"))["files"]
 
 
 def create_backup(name: str = ""):
@@ -607,35 +883,91 @@ def create_backup(name: str = ""):
         name = f'BCML_Backup_{datetime.datetime.now().strftime("%Y-%m-%d")}'
     else:
         name = re.sub(r"(?u)[^-\w.]", "", name.strip().replace(" ", "_"))
-    num_mods = len([d for d in util.get_modpack_dir().glob("*") if d.is_dir()])
-    output = util.get_storage_dir() / "backups" / f"{name}---{num_mods - 1}.7z"
+    mod_dir = util.get_modpack_dir()
+    num_mods = len([d for d in mod_dir.glob("*") if d.is_dir()])
+    output = get_backup_dir() / f"{name}---{num_mods - 1}{BACKUP_EXT}"
     output.parent.mkdir(parents=True, exist_ok=True)
     print(f"Saving backup {name}...")
-    x_args = [get_7z_path(), "a", str(output), f'{str(util.get_modpack_dir() / "*")}']
-    if system() == "Windows":
-        subprocess.run(
-            x_args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            creationflags=util.CREATE_NO_WINDOW,
-            check=True,
-        )
-    else:
-        subprocess.run(
-            x_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
-        )
+    # Files unchanged since an earlier backup can reuse its blobs without rehashing
+    known_files = {
+        (file, entry["size"], entry["mtime"]): entry["blobs"]
+        for manifest in get_backup_dir().glob(f"*{BACKUP_EXT}")
+        for file, entry in _load_backup_manifest(manifest).items()
+    }
+    files = {}
+    for file, size, mtime in util.get_tree_signature(mod_dir):
+        blobs = known_files.get((file, size, mtime))
+        if blobs is None:
+            util.vprint(f"Storing {file}")
+            blobs = _store_backup_file(mod_dir / file)
+        files[file] = {"size": size, "mtime": mtime, "blobs": blobs}
+    output.write_text(json.dumps({"version": 1, "files": files}), encoding="utf-8")
     print(f'Backup "{name}" created')
 
 
 def get_backups() -> List[Path]:
-    return list((util.get_storage_dir() / "backups").glob("*.7z"))
+    return [
+        *get_backup_dir().glob("*.7z"),
+        *get_backup_dir().glob(f"*{BACKUP_EXT}"),
+    ]
 
 
-def restore_backup(backup: Union[str, Path]):
+def delete_backup(backup: Union[str, Path]):
     if isinstance(backup, str):
         backup = Path(backup)
-    if not backup.exists():
-        raise FileNotFoundError(f'The backup "{backup.name}" does not exist.')
+    backup.unlink()
+    if backup.suffix != BACKUP_EXT:
+        return
+    used_blobs = {
+        blob
+        for manifest in get_backup_dir().glob(f"*{BACKUP_EXT}")
+        for entry in _load_backup_manifest(manifest).values()
+        for blob in entry["blobs"]
+    }
+    for blob_path in (get_backup_dir() / "blobs").glob("*/*"):
+        if blob_path.name not in used_blobs:
+            blob_path.unlink()
+
+
+def _restore_backup_manifest(backup: Path):
+    mod_dir = util.get_modpack_dir()
+    folders: Dict[str, Dict[str, dict]] = {}
+    for file, entry in _load_backup_manifest(backup).items():
+        folders.setdefault(file.split("/")[0], {})[file] = entry
+    print("Clearing changed mods...")
+    for folder in [item for item in mod_dir.glob("*") if item.is_dir()]:
+        if folder.name not in folders:
+            shutil.rmtree(str(folder))
+    print("Restoring backup...")
+    for folder, files in folders.items():
+        target = mod_dir / folder
+        if target.is_dir():
+            current = {
+                (f"{folder}/{file}", size, mtime)
+                for file, size, mtime in util.get_tree_signature(target)
+            }
+        elif target.is_file():
+            stat_result = target.stat()
+            current = {(folder, stat_result.st_size, stat_result.st_mtime_ns)}
+        else:
+            current = set()
+        if current == {(f, e["size"], e["mtime"]) for f, e in files.items()}:
+            continue
+        util.vprint(f"Restoring {folder}")
+        if target.is_dir():
+            shutil.rmtree(str(target))
+        elif target.exists():
+            target.unlink()
+        for file, entry in files.items():
+            out = mod_dir / file
+            out.parent.mkdir(parents=True, exist_ok=True)
+            with out.open("wb") as o_file:
+                for blob in entry["blobs"]:
+                    o_file.write(_load_backup_blob(blob))
+            os.utime(out, ns=(entry["mtime"], entry["mtime"]))
+
+
+def _restore_backup_7z(backup: Path):
     print("Clearing installed mods...")
     for folder in [item for item in util.get_modpack_dir().glob("*") if item.is_dir()]:
         shutil.rmtree(str(folder))
@@ -653,6 +985,17 @@ def restore_backup(backup: Union[str, Path]):
         subprocess.run(
             x_args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
         )
+
+
+def restore_backup(backup: Union[str, Path]):
+    if isinstance(backup, str):
+        backup = Path(backup)
+    if not backup.exists():
+        raise FileNotFoundError(f'The backup "{backup.name}" does not exist.')
+    if backup.suffix == BACKUP_EXT:
+        _restore_backup_manifest(backup)
+    else:
+        _restore_backup_7z(backup)
     print("Re-enabling mods in Cemu...")
     refresh_master_export()
     print(f'Backup "{backup.name}" restored')
@@ -757,44 +1100,118 @@ def link_master_mod(output: Path = None):
             raise
 
 
-def export(output: Path, standalone: bool = False):
-    print("Loading files...")
-    tmp_dir = Path(mkdtemp())
-    if tmp_dir.exists():
+EXPORT_MANIFEST = ".bcml_export.json"
+
+
+def _hash_file(file: Path) -> str:
+    hasher = xxhash.xxh64()
+    with file.open("rb") as h_file:
+        for chunk in iter(partial(h_file.read, 1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def sync_export(source: Path, output: Path) -> Dict[str, int]:
+    """
+    Exports a folder to another one, e.g. an SD card, copying only files that changed
+    since the last export there and deleting files that are no longer exported. A
+    manifest of the exported files is kept in the output folder.
+
+    :returns: A dict with the number of bytes copied and the number of bytes skipped
+    """
+    manifest_path = output / EXPORT_MANIFEST
+    old_manifest: Dict[str, dict] = {}
+    if manifest_path.exists():
         try:
-            rmtree(tmp_dir)
-        except (OSError, FileNotFoundError, PermissionError) as err:
-            raise RuntimeError(
-                "There was a problem cleaning the temporary export directory. This may be"
-                " a fluke, so consider restarting BCML and trying again."
-            ) from err
-    link_master_mod(tmp_dir)
-    if output.suffix == ".bnp" or output.name.endswith(".bnp.7z"):
+            old_manifest = json.loads(manifest_path.read_text("utf-8"))["files"]
+        except (json.JSONDecodeError, KeyError):
+            pass
+    manifest: Dict[str, dict] = {}
+    stats = {"copied": 0, "skipped": 0, "deleted": 0}
+    for file, size, mtime in sorted(util.get_tree_signature(source)):
+        old = old_manifest.get(file, {})
+        if old.get("size") == size and old.get("mtime") == mtime:
+            file_hash = old["hash"]
+        else:
+            file_hash = _hash_file(source / file)
+        manifest[file] = {"size": size, "mtime": mtime, "hash": file_hash}
+        out = output / file
+        if (
+            old.get("hash") == file_hash
+            and old.get("size") == size
+            and out.is_file()
+            and out.stat().st_size == size
+        ):
+            stats["skipped"] += size
+            continue
+        util.vprint(f"Copying {file}")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source / file, out)
+        stats["copied"] += size
+    for file in set(old_manifest) - set(manifest):
+        out = output / file
+        if out.is_file():
+            out.unlink()
+            stats["deleted"] += 1
+        for parent in out.parents:
+            if parent == output or not parent.is_dir() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+    manifest_path.write_text(
+        json.dumps({"version": 1, "files": manifest}), encoding="utf-8"
+    )
+    print(
+        f"Copied {stats['copied'] / 1048576:.1f} MB, skipped "
+        f"{stats['skipped'] / 1048576:.1f} MB unchanged, "
+        f"deleted {stats['deleted']} files"
+    )
+    return stats
+
+
+def export(output: Path, standalone: bool = False, folder: bool = False):
+    print("Loading files...")
+    # The internal merged folder is rebuilt on every refresh, so it can be exported
+    # directly instead of linking another copy of it into a temp folder first
+    merged = util.get_merged_modpack_dir()
+    tmp_dir: Optional[Path] = None
+    if not merged.exists() or not any(merged.iterdir()):
+        tmp_dir = Path(mkdtemp())
+        if tmp_dir.exists():
+            try:
+                rmtree(tmp_dir)
+            except (OSError, FileNotFoundError, PermissionError) as err:
+                raise RuntimeError(
+                    "There was a problem cleaning the temporary export directory. "
+                    "This may be a fluke, so consider restarting BCML and trying again."
+                ) from err
+        link_master_mod(tmp_dir)
+        merged = tmp_dir
+    if folder:
+        print(f"Exporting changes to {output}...")
+        output.mkdir(parents=True, exist_ok=True)
+        sync_export(merged, output)
+    elif output.suffix == ".bnp" or output.name.endswith(".bnp.7z"):
         print("Exporting BNP...")
         dev.create_bnp_mod(
-            mod=tmp_dir,
+            mod=merged,
             meta={},
             output=output,
             options={"rstb": {"no_guess": util.get_settings("no_guess")}},
         )
     else:
         print("Exporting as graphic pack mod...")
-        x_args = [get_7z_path(), "a", str(output), f'{str(tmp_dir / "*")}']
-        result: subprocess.CompletedProcess
-        if os.name == "nt":
-            result = subprocess.run(
-                x_args,
-                creationflags=util.CREATE_NO_WINDOW,
-                check=False,
-                capture_output=True,
-                universal_newlines=True,
-            )
-        else:
-            result = subprocess.run(
-                x_args, check=False, capture_output=True, universal_newlines=True
+        try:
+            _zip.write_zip(
+                output,
+                (
+                    (file, file.relative_to(merged).as_posix())
+                    for file in sorted(merged.rglob("*"))
+                    if file.is_file()
+                ),
             )
-        if result.stderr:
+        except OSError as err:
             raise RuntimeError(
-                f"There was an error exporting your mod(s). {result.stderr}"
-            )
-    rmtree(tmp_dir, True)
+                f"There was an error exporting your mod(s). {str(err)}"
+            ) from err
+    if tmp_dir:
+        rmtree(tmp_dir, True)
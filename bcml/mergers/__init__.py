@@ -1,8 +1,20 @@
 """ Provides abstracted merging objects """
 from abc import ABCMeta
-from multiprocessing.pool import Pool
 from pathlib import Path
-from typing import List, Union, Type, Set, Optional, Tuple, Iterable
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Union,
+    Type,
+    Sequence,
+    Set,
+    Optional,
+    Tuple,
+    Iterable,
+)
 from bcml import util
 
 
@@ -17,7 +29,7 @@ class Merger(metaclass=ABCMeta):
     _description: str
     _log_name: str
     _options: dict
-    _pool: Optional[Pool]
+    _pool: Optional[util.Executor]
 
     def __init__(
         self, friendly_name: str, description: str, log_name: str, options: dict = None
@@ -46,8 +58,8 @@ class Merger(metaclass=ABCMeta):
         """The name of the log file created by this merger"""
         return self._log_name
 
-    def set_pool(self, pool: Pool):
-        """Sets the multiprocessing Pool to use when merging"""
+    def set_pool(self, pool: util.Executor):
+        """Sets the executor to use for parallel work when merging"""
         self._pool = pool
 
     def set_options(self, options: dict):
@@ -62,6 +74,15 @@ class Merger(metaclass=ABCMeta):
         """Saves generated diffs to a log file"""
         raise NotImplementedError
 
+    def get_log_inputs(
+        self, modded_files: List[Union[str, Path]]
+    ) -> List[Union[str, Path]]:
+        """
+        Gets the modified files which this merger's log depends on, used to decide
+        whether a cached log can be reused. By default every modified file counts.
+        """
+        return modded_files
+
     def is_mod_logged(self, mod: util.BcmlMod) -> bool:
         """Checks if a mod is logged for this merge"""
         return (mod.path / "logs" / self._log_name).exists()
@@ -174,3 +195,40 @@ def sort_mergers(mergers: Iterable[Merger]) -> List[Merger]:
         key=lambda merger: merger_names.index(merger.NAME),
         reverse=False,
     )
+
+
+def index_records(
+    records: Iterable[Any], key: Callable[[Any], Hashable]
+) -> Dict[Hashable, int]:
+    """Maps the key of each record to the position of its first occurrence"""
+    index: Dict[Hashable, int] = {}
+    for i, record in enumerate(records):
+        index.setdefault(key(record), i)
+    return index
+
+
+def diff_keyed_records(
+    stock: Sequence[Any], modded: Iterable[Any], key: Callable[[Any], Hashable]
+) -> Tuple[List[Any], Dict[Hashable, Any], List[Hashable]]:
+    """
+    Diffs two lists of records which are identified by a key, e.g. quests by name
+
+    :param stock: The original records
+    :param modded: The modified records
+    :param key: A function which returns the key of a record
+    :return: Returns a tuple of the added records, a dict of keys to modified records,
+    and the keys of deleted records.
+    """
+    stock_index = index_records(stock, key)
+    mod_keys = set()
+    added: List[Any] = []
+    modified: Dict[Hashable, Any] = {}
+    for record in modded:
+        record_key = key(record)
+        mod_keys.add(record_key)
+        if record_key not in stock_index:
+            added.append(record)
+        elif record != stock[stock_index[record_key]]:
+            modified[record_key] = record
+    deleted = [k for k in stock_index if k not in mod_keys]
+    return added, modified, deleted
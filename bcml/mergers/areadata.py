@@ -1,7 +1,6 @@
 import rstb
 import oead
 
-from functools import lru_cache
 from pathlib import Path
 from typing import List, Union
 from bcml import mergers, util
@@ -9,41 +8,45 @@ from bcml.util import BcmlMod
 from bcml.mergers import rstable
 
 
+def get_area_number(area: oead.byml.Hash) -> str:
+    return str(area["AreaNumber"].v)
+
+
+@util.cached(*util.GAME_SETTINGS)
+def _get_stock_areadata_bytes() -> bytes:
+    return util.get_nested_file_bytes(
+        str(util.get_game_file("Pack/Bootup.pack")) + "//Ecosystem/AreaData.sbyml",
+        unyaz=True,
+    )
+
+
+def get_stock_areadata_list() -> oead.byml.Array:
+    return oead.byml.from_binary(_get_stock_areadata_bytes())
+
+
 def get_stock_areadata() -> oead.byml.Hash:
-    if not hasattr(get_stock_areadata, "areadata"):
-        get_stock_areadata.areadata = oead.byml.to_text(
-            oead.byml.Hash(
-                {
-                    str(area["AreaNumber"].v): area
-                    for area in oead.byml.from_binary(
-                        util.get_nested_file_bytes(
-                            str(util.get_game_file("Pack/Bootup.pack"))
-                            + "//Ecosystem/AreaData.sbyml",
-                            unyaz=True,
-                        )
-                    )
-                }
-            )
-        )
-    return oead.byml.from_text(get_stock_areadata.areadata)
+    return oead.byml.Hash(
+        {get_area_number(area): area for area in get_stock_areadata_list()}
+    )
 
 
 def get_modded_areadata(areadata: oead.byml.Array) -> oead.byml.Hash:
-    stock_areadata = get_stock_areadata()
-    mod_areadata = oead.byml.Hash(
-        {str(area["AreaNumber"].v): area for area in areadata}
+    stock_areadata = get_stock_areadata_list()
+    added, modified_areas, _ = mergers.diff_keyed_records(
+        stock_areadata, areadata, get_area_number
     )
+    if added:
+        raise RuntimeError(
+            "Invalid AreaData.sbyml. One or more areas missing key: "
+            f"{tuple(get_area_number(area) for area in added)}"
+        )
+    stock_index = mergers.index_records(stock_areadata, get_area_number)
     modified = oead.byml.Hash()
     try:
-        for area_num in [
-            k for k in mod_areadata if mod_areadata[k] != stock_areadata[k]
-        ]:
+        for area_num, area in modified_areas.items():
+            stock_area = stock_areadata[stock_index[area_num]]
             modified[area_num] = oead.byml.Hash(
-                {
-                    k: v
-                    for k, v in mod_areadata[area_num].items()
-                    if v != stock_areadata[area_num][k]
-                }
+                {k: v for k, v in area.items() if v != stock_area[k]}
             )
     except KeyError as err:
         raise RuntimeError(
@@ -84,6 +87,10 @@ class AreaDataMerger(mergers.Merger):
         else:
             return {}
 
+    def get_log_inputs(self, modded_files: List[Union[Path, str]]):
+        needle = f"{util.get_content_path()}/Pack/Bootup.pack//Ecosystem/AreaData.sbyml"
+        return [needle] if needle in modded_files else []
+
     def log_diff(self, mod_dir: Path, diff_material):
         if isinstance(diff_material, List):
             diff_material = self.generate_diff(mod_dir, diff_material)
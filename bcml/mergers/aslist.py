@@ -508,8 +508,9 @@ class ASListMerger(mergers.Merger):
         if not diffs:
             print("No AS list merge needed")
             return
+        util.advance_progress(self.NAME, 0, total=len(diffs))
         pool = self._pool or util.start_pool()
-        pool.starmap(merge_aamp_files, diffs.items())
+        pool.starmap(util.progress_task(self.NAME, merge_aamp_files), diffs.items())
         if not self._pool:
             pool.close()
             pool.join()
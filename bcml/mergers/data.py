@@ -4,9 +4,9 @@ Provides functions to diff and merge BOTW gamedat and savedata.
 # Copyright 2020 Nicene Nerd <macadamiadaze@gmail.com>
 # Licensed under GPLv3+
 # pylint: disable=unsupported-assignment-operation
-from functools import lru_cache
+from functools import partial
 from math import ceil
-from multiprocessing import Pool, pool
+from multiprocessing import Pool
 from operator import itemgetter
 from pathlib import Path
 from typing import List, Union, Dict
@@ -15,7 +15,7 @@ import oead
 import xxhash
 from oead.byml import Hash
 
-from bcml import util, mergers
+from bcml import util, mergers, pickles
 from bcml.mergers import rstable
 from bcml.util import BcmlMod
 
@@ -32,7 +32,7 @@ def get_stock_savedata() -> oead.Sarc:
     )
 
 
-@lru_cache(None)
+@util.cached(*util.GAME_SETTINGS)
 def get_gamedata_hashes() -> Dict[str, int]:
     gamedata = get_stock_gamedata()
     return {
@@ -40,7 +40,7 @@ def get_gamedata_hashes() -> Dict[str, int]:
     }
 
 
-@lru_cache(None)
+@util.cached(*util.GAME_SETTINGS)
 def get_savedata_hashes() -> Dict[str, int]:
     savedata = get_stock_savedata()
     return {
@@ -56,7 +56,12 @@ def consolidate_gamedata(gamedata: oead.Sarc) -> Hash:
     return data
 
 
-def diff_gamedata_type(data_type: str, mod_data: dict, stock_data: dict) -> Hash:
+def diff_gamedata_type(
+    data_type: str,
+    mod_data: oead.byml.Array,
+    stock_data: Union[oead.byml.Array, pickles.Payload],
+) -> Hash:
+    stock_data = pickles.unwrap(stock_data)
     stock_entries = {entry["DataName"]: entry for entry in stock_data}
     del stock_data
     mod_entries = {entry["DataName"] for entry in mod_data}
@@ -83,14 +88,29 @@ def diff_gamedata_type(data_type: str, mod_data: dict, stock_data: dict) -> Hash
     return Hash({data_type: diffs})
 
 
-def get_modded_gamedata_entries(gamedata: oead.Sarc, pool: pool.Pool = None) -> Hash:
+def get_modded_gamedata_entries(gamedata: oead.Sarc, pool: util.Executor = None) -> Hash:
     this_pool = pool or util.start_pool()
-    stock_data = consolidate_gamedata(get_stock_gamedata())
     mod_data = consolidate_gamedata(gamedata)
     del gamedata
+    stock_data: List[Hash] = []
+
+    def load_stock_type(data_type: str) -> oead.byml.Array:
+        if not stock_data:
+            stock_data.append(consolidate_gamedata(get_stock_gamedata()))
+        return stock_data[0][data_type]
+
+    # The stock entries are placed in shared memory once per pool, so installing
+    # several mods on one pool serialises and sends them only once
     results = this_pool.starmap(
         diff_gamedata_type,
-        ((key, mod_data[key], stock_data[key]) for key in mod_data),
+        (
+            (
+                key,
+                mod_data[key],
+                this_pool.share(("gamedata", key), partial(load_stock_type, key)),
+            )
+            for key in mod_data
+        ),
     )
     diffs = Hash({data_type: diff for d in results for data_type, diff in d.items()})
     del results
@@ -228,8 +228,9 @@ class DropMerger(mergers.Merger):
             print("No drop table merging necessary")
             return
         print("Merging drop table edits...")
+        util.advance_progress(self.NAME, 0, total=len(diffs))
         pool = self._pool or util.start_pool()
-        pool.starmap(merge_drop_file, diffs.items())
+        pool.starmap(util.progress_task(self.NAME, merge_drop_file), diffs.items())
         if not self._pool:
             pool.close()
             pool.join()
@@ -26,7 +26,10 @@ class StatusEffectMerger(mergers.Merger):
         )
 
     def generate_diff(self, mod_dir: Path, modded_files: List[Union[str, Path]]):
-        needle = f"{util.get_content_path()}/Pack/Bootup.pack//Ecosystem/StatusEffectList.sbyml"
+        needle = (
+            f"{util.get_content_path()}/Pack/Bootup.pack//"
+            "Ecosystem/StatusEffectList.sbyml"
+        )
         if needle not in modded_files:
             return {}
         print("Logging changes to effect status levels...")
@@ -47,6 +50,13 @@ class StatusEffectMerger(mergers.Merger):
         del stock_effects
         del mod_effects
 
+    def get_log_inputs(self, modded_files: List[Union[str, Path]]):
+        needle = (
+            f"{util.get_content_path()}/Pack/Bootup.pack//"
+            "Ecosystem/StatusEffectList.sbyml"
+        )
+        return [needle] if needle in modded_files else []
+
     def log_diff(self, mod_dir: Path, diff_material):
         if isinstance(diff_material, list):
             diff_material = self.generate_diff(mod_dir, diff_material)
@@ -11,18 +11,21 @@ from bcml.util import BcmlMod
 from bcml.mergers import rstable
 
 
-def get_stock_eventinfo() -> oead.byml.Hash:
-    if not hasattr(get_stock_eventinfo, "event_info"):
-        get_stock_eventinfo.event_info = oead.byml.to_text(
-            oead.byml.from_binary(
-                util.get_nested_file_bytes(
-                    str(util.get_game_file("Pack/Bootup.pack"))
-                    + "//Event/EventInfo.product.sbyml",
-                    unyaz=True,
-                )
+@util.cached(*util.GAME_SETTINGS)
+def _get_stock_eventinfo_text() -> str:
+    return oead.byml.to_text(
+        oead.byml.from_binary(
+            util.get_nested_file_bytes(
+                str(util.get_game_file("Pack/Bootup.pack"))
+                + "//Event/EventInfo.product.sbyml",
+                unyaz=True,
             )
         )
-    return oead.byml.from_text(get_stock_eventinfo.event_info)
+    )
+
+
+def get_stock_eventinfo() -> oead.byml.Hash:
+    return oead.byml.from_text(_get_stock_eventinfo_text())
 
 
 def get_modded_events(event_info: oead.byml.Hash) -> oead.byml.Hash:
@@ -70,6 +73,12 @@ class EventInfoMerger(mergers.Merger):
         else:
             return {}
 
+    def get_log_inputs(self, modded_files: List[Union[Path, str]]):
+        needle = (
+            f"{util.get_content_path()}/Pack/Bootup.pack//Event/EventInfo.product.sbyml"
+        )
+        return [needle] if needle in modded_files else []
+
     def log_diff(self, mod_dir: Path, diff_material):
         if isinstance(diff_material, List):
             diff_material = self.generate_diff(mod_dir, diff_material)
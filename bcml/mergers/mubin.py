@@ -1,7 +1,6 @@
 """Handles diffing and merging map files"""
 # Copyright 2020 Nicene Nerd <macadamiadaze@gmail.com>
 # Licensed under GPLv3+
-import multiprocessing
 import shutil
 from collections import namedtuple
 from functools import partial
@@ -271,7 +270,7 @@ def get_map_diff(map_unit: Map, tmp_dir: Path, new_hashes: bool = False) -> Hash
 def generate_modded_map_log(
     tmp_dir: Path,
     modded_mubins: List[Path],
-    pool: multiprocessing.pool.Pool = None,
+    pool: util.Executor = None,
     new_hashes: bool = False,
 ) -> Hash:
     modded_maps = consolidate_map_files(modded_mubins)
@@ -429,6 +428,10 @@ def merge_map(
     }
 
 
+def get_spawn_name(spawn_point: Hash) -> str:
+    return f"{str(spawn_point['Map'])}___{str(spawn_point['PosName'])}"
+
+
 def get_dungeonstatic_diff(mod_pos: Array) -> dict:
     try:
         base_pos = oead.byml.from_binary(
@@ -443,17 +446,14 @@ def get_dungeonstatic_diff(mod_pos: Array) -> dict:
             )
         )["StartPos"]
 
-    base_names = [
-        f"{str(spawn_point['Map'])}___{str(spawn_point['PosName'])}"
-        for spawn_point in base_pos
-    ]
+    base_names = mergers.index_records(base_pos, get_spawn_name)
     diffs = {}
     for mod_spawn in mod_pos:
-        spawn_name = f"{str(mod_spawn['Map'])}___{str(mod_spawn['PosName'])}"
+        spawn_name = get_spawn_name(mod_spawn)
         if spawn_name not in base_names:
             diffs[spawn_name] = mod_spawn
         else:
-            base_spawn = base_pos[base_names.index(spawn_name)]
+            base_spawn = base_pos[base_names[spawn_name]]
             diff = {}
             if mod_spawn["Rotate"] != base_spawn["Rotate"]:
                 diff["Rotate"] = mod_spawn["Rotate"]
@@ -487,18 +487,16 @@ def merge_dungeonstatic(diffs: dict = None):
             )
         )
 
-    base_names = [
-        f"{str(spawn_point['Map'])}___{str(spawn_point['PosName'])}"
-        for spawn_point in new_static["StartPos"]
-    ]
+    base_names = mergers.index_records(new_static["StartPos"], get_spawn_name)
     for spawn_name, diff in diffs.items():
         if "___" not in spawn_name:
             spawn_name = f"{spawn_name}___Entrance_1"
         if spawn_name not in base_names:
+            base_names[spawn_name] = len(new_static["StartPos"])
             new_static["StartPos"].append(diff)
         else:
             for key, value in diff.items():
-                new_static["StartPos"][base_names.index(spawn_name)][key] = value
+                new_static["StartPos"][base_names[spawn_name]][key] = value
 
     data = util.compress(
         oead.byml.to_binary(new_static, big_endian=util.get_settings("wiiu"))
@@ -525,6 +523,53 @@ def merge_dungeonstatic(diffs: dict = None):
     output_static.write_bytes(data)
 
 
+def group_map_diffs(diffs: List[Hash]) -> Dict[str, List[Hash]]:
+    """Groups a list of mod map diffs by map unit, in mod priority order"""
+    unit_diffs: Dict[str, List[Hash]] = {}
+    for mod_diff in diffs:
+        for unit, diff in mod_diff.items():
+            unit_diffs.setdefault(unit, []).append(diff)
+    return unit_diffs
+
+
+def consolidate_map_unit(mods: List[Hash]) -> Hash:
+    """Combines the diffs of every mod which edits a single map unit"""
+    c_diff = Hash()
+    for section in ("Objs", "Rails"):
+        edits = [mod[section] for mod in mods if section in mod]
+        deleted = {
+            hash_id.v for edit in edits if "del" in edit for hash_id in edit["del"]
+        }
+        modified = Hash()
+        for edit in edits:
+            if "mod" in edit:
+                for hash_id, actor in edit["mod"].items():
+                    modified[hash_id] = actor
+        added = Array()
+        added_hashes = set()
+        for edit in reversed(edits):
+            if "add" in edit:
+                for actor in edit["add"]:
+                    if actor["HashId"].v not in added_hashes:
+                        added_hashes.add(actor["HashId"].v)
+                        added.append(actor)
+        c_diff[section] = Hash(
+            {
+                "add": added,
+                "mod": modified,
+                "del": Array([oead.U32(h) for h in deleted]),
+            }
+        )
+    return c_diff
+
+
+def consolidate_map_unit_binary(unit_diffs: Tuple[str, List[Hash]]) -> bytes:
+    unit, mods = unit_diffs
+    return bytes(
+        oead.byml.to_binary(Hash({unit: consolidate_map_unit(mods)}), True)
+    )
+
+
 def parse_legacy_diff(text: str) -> Hash:
     diff = oead.byml.from_text(text)
     return Hash(
@@ -564,6 +609,17 @@ class MapMerger(mergers.Merger):
             )
         return {}
 
+    def get_log_inputs(self, modded_files: List[Union[Path, str]]):
+        return [
+            file
+            for file in modded_files
+            if isinstance(file, Path)
+            and "MainField" in file.parts
+            and file.suffix == ".smubin"
+            and not file.name.startswith("_")
+            and "_" in file.name
+        ]
+
     def log_diff(self, mod_dir: Path, diff_material):
         if isinstance(diff_material, List):
             diff_material = self.generate_diff(mod_dir, diff_material)
@@ -599,85 +655,12 @@ class MapMerger(mergers.Merger):
         return diffs
 
     def consolidate_diffs(self, diffs: list):
-        a_diffs = Hash()
-        for mod_diff in diffs:
-            for file, diff in mod_diff.items():
-                # a_map = Map(*file.split("_"))
-                if file not in a_diffs:
-                    a_diffs[file] = Array()
-                a_diffs[file].append(diff)
-        c_diffs = Hash()
-        for file, mods in a_diffs.items():
-            c_diffs[file] = Hash(
-                {
-                    "Objs": Hash(
-                        {
-                            "add": Array(),
-                            "mod": Hash(),
-                            "del": Array(
-                                [
-                                    oead.U32(h)
-                                    for h in set(
-                                        [
-                                            hash_id.v
-                                            for hashes in [
-                                                mod["Objs"]["del"]
-                                                for mod in mods
-                                                if "Objs" in mod
-                                                and "del" in mod["Objs"]
-                                            ]
-                                            for hash_id in hashes
-                                        ]
-                                    )
-                                ]
-                            ),
-                        }
-                    ),
-                    "Rails": Hash(
-                        {
-                            "add": Array(),
-                            "mod": Hash(),
-                            "del": Array(
-                                [
-                                    oead.U32(h)
-                                    for h in set(
-                                        [
-                                            hash_id.v
-                                            for hashes in [
-                                                mod["Rails"]["del"]
-                                                for mod in mods
-                                                if "Rails" in mod
-                                                and "del" in mod["Rails"]
-                                            ]
-                                            for hash_id in hashes
-                                        ]
-                                    )
-                                ]
-                            ),
-                        }
-                    ),
-                }
-            )
-            for mod in [m for m in mods if "Objs" in m and "mod" in m["Objs"]]:
-                for hash_id, actor in mod["Objs"]["mod"].items():
-                    c_diffs[file]["Objs"]["mod"][hash_id] = actor
-            for mod in [m for m in mods if "Rails" in m and "mod" in m["Rails"]]:
-                for hash_id, actor in mod["Rails"]["mod"].items():
-                    c_diffs[file]["Rails"]["mod"][hash_id] = actor
-            add_obj_hashes = []
-            add_rail_hashes = []
-            for mod in reversed(mods):
-                if "add" in mod["Objs"]:
-                    for actor in mod["Objs"]["add"]:
-                        if actor["HashId"] not in add_obj_hashes:
-                            add_obj_hashes.append(actor["HashId"])
-                            c_diffs[file]["Objs"]["add"].append(actor)
-                if "add" in mod["Rails"]:
-                    for actor in mod["Rails"]["add"]:
-                        if actor["HashId"] not in add_rail_hashes:
-                            add_rail_hashes.append(actor["HashId"])
-                            c_diffs[file]["Rails"]["add"].append(actor)
-        return c_diffs
+        return Hash(
+            {
+                unit: consolidate_map_unit(mods)
+                for unit, mods in group_map_diffs(diffs).items()
+            }
+        )
 
     @util.timed
     def perform_merge(self):
@@ -704,7 +687,7 @@ class MapMerger(mergers.Merger):
         if log_path.exists():
             log_path.unlink()
         print("Loading map mods...")
-        map_diffs = self.consolidate_diffs(self.get_all_diffs())
+        map_diffs = group_map_diffs(self.get_all_diffs())
         if not map_diffs:
             print("No map merge necessary")
             return
@@ -720,21 +703,26 @@ class MapMerger(mergers.Merger):
             aoc_pack.parent.mkdir(parents=True, exist_ok=True)
             aoc_pack.write_bytes(b"")
 
-        rstb_vals = rsext.mergers.maps.merge_maps(oead.byml.to_binary(map_diffs, True))
-        # rstb_calc = rstb.SizeCalculator()
         print("Merging modded map units...")
-
-        # pool = self._pool or util.start_pool()
-        # rstb_results = pool.map(
-        # partial(merge_map, rstb_calc=rstb_calc),
-        # map_diffs.items(),
-        # )
-        # for result in rstb_results:
-        # rstb_vals[result[util.get_dlc_path()][0]] = result[util.get_dlc_path()][1]
-        # rstb_vals[result["main"][0]] = result["main"][1]
-        # if not self._pool:
-        # pool.close()
-        # pool.join()
+        rstb_vals = {}
+        pool = self._pool or util.start_pool()
+        util.advance_progress(self.NAME, 0, total=len(map_diffs))
+        # Each unit is consolidated in the worker processes and handed on to the Rust
+        # merger, which releases the GIL, so it runs on threads. Both stages take
+        # units through a window, so besides the mods' diffs, which are all loaded
+        # up front, only a few consolidated and stock units are in memory at once.
+        window = 2 * pool.processes
+        units = pool.imap_unordered(
+            consolidate_map_unit_binary, map_diffs.items(), max_pending=window
+        )
+        for unit_vals in pool.imap_unordered(
+            rsext.mergers.maps.merge_maps, units, release_gil=True, max_pending=window
+        ):
+            rstb_vals.update(unit_vals)
+            util.advance_progress(self.NAME)
+        if not self._pool:
+            pool.close()
+            pool.join()
 
         stock_static = [m for m in map_diffs if m[1] == "Static"]
         if stock_static:
@@ -768,10 +756,7 @@ class MapMerger(mergers.Merger):
         ]
 
     def get_mod_edit_info(self, mod: util.BcmlMod) -> set:
-        return {
-            f"{key.section}_{key.type}"
-            for key in self.consolidate_diffs(self.get_mod_diff(mod))
-        }
+        return set(group_map_diffs(self.get_mod_diff(mod)))
 
 
 class DungeonStaticMerger(mergers.Merger):
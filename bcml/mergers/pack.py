@@ -49,7 +49,7 @@ def merge_sarcs(file_name: str, sarcs: List[Union[Path, bytes]]) -> Tuple[str, b
 
     for opened_sarc in reversed(opened_sarcs):
         for file in [f for f in opened_sarc.get_files() if f.name not in files_added]:
-            file_data = oead.Bytes(file.data)
+            file_data = file.data
             canon = file.name.replace(".s", ".")
             if (
                 file.name[file.name.rindex(".") :] in util.SARC_EXTS - EXCLUDE_EXTS
@@ -60,7 +60,7 @@ def merge_sarcs(file_name: str, sarcs: List[Union[Path, bytes]]) -> Tuple[str, b
             elif (
                 canon not in util.get_hash_table(util.get_settings("wiiu"))
             ) or util.is_file_modded(canon, file_data, count_new=True):
-                new_sarc.files[file.name] = file_data
+                new_sarc.files[file.name] = oead.Bytes(file_data)
                 files_added.add(file.name)
 
     for file, sarcs in [(f, s) for (f, s) in nested_sarcs.items() if s]:
@@ -1,11 +1,15 @@
 from functools import lru_cache
 from pathlib import Path
-from typing import List, Union
+from typing import Hashable, List, Union
 
 import oead
 from bcml import mergers, util
 
 
+def get_quest_name(quest: oead.byml.Hash) -> Hashable:
+    return quest["Name"]
+
+
 def get_stock_quests() -> oead.byml.Array:
     title_sarc = oead.Sarc(util.get_game_file("Pack/TitleBG.pack").read_bytes())
     return oead.byml.from_binary(
@@ -13,6 +17,56 @@ def get_stock_quests() -> oead.byml.Array:
     )
 
 
+def insert_quests(
+    quests: oead.byml.Array, adds: oead.byml.Array
+) -> oead.byml.Array:
+    """
+    Inserts added quests after the quest which preceded them in their mod, or at the
+    end if that quest is missing. The quests are kept in a linked list while inserting
+    so each insertion only needs a name lookup instead of a list scan.
+    """
+    nodes = list(quests)
+    following = list(range(1, len(nodes))) + [-1]
+    head, tail = (0, len(nodes) - 1) if nodes else (-1, -1)
+    positions = mergers.index_records(nodes, get_quest_name)
+    added_names = set()
+    for add in adds:
+        if add["Name"] in added_names:
+            continue
+        anchor = -1
+        if "prev_quest" in add:
+            prev_quest = add["prev_quest"]
+            del add["prev_quest"]
+            if prev_quest == "--index_zero":
+                anchor = -2
+            elif prev_quest in positions:
+                anchor = positions[prev_quest]
+        node = len(nodes)
+        nodes.append(add)
+        following.append(-1)
+        if anchor == -2 or head == -1:
+            following[node] = head
+            head = node
+            if tail == -1:
+                tail = node
+        elif anchor == -1:
+            following[tail] = node
+            tail = node
+        else:
+            following[node] = following[anchor]
+            following[anchor] = node
+            if tail == anchor:
+                tail = node
+        positions.setdefault(add["Name"], node)
+        added_names.add(add["Name"])
+    merged = oead.byml.Array()
+    node = head
+    while node != -1:
+        merged.append(nodes[node])
+        node = following[node]
+    return merged
+
+
 class QuestMerger(mergers.Merger):
     NAME: str = "quests"
 
@@ -29,7 +83,6 @@ class QuestMerger(mergers.Merger):
             return {}
         print("Logging modified quests...")
         stock_quests = get_stock_quests()
-        stock_names = [q["Name"] for q in stock_quests]
 
         title_sarc = oead.Sarc(
             (mod_dir / util.get_content_path() / "Pack" / "TitleBG.pack").read_bytes()
@@ -37,24 +90,25 @@ class QuestMerger(mergers.Merger):
         mod_quests = oead.byml.from_binary(
             util.decompress(title_sarc.get_file("Quest/QuestProduct.sbquestpack").data)
         )
-        mod_names = [q["Name"] for q in mod_quests]
-        diffs = oead.byml.Hash(
+        for i, quest in enumerate(mod_quests):
+            quest["prev_quest"] = mod_quests[i - 1]["Name"] if i > 0 else "--index_zero"
+        added, modified, deleted = mergers.diff_keyed_records(
+            stock_quests, mod_quests, get_quest_name
+        )
+        return oead.byml.Hash(
             {
-                "add": oead.byml.Array(),
-                "mod": oead.byml.Hash(),
-                "del": oead.byml.Array({q for q in stock_names if q not in mod_names}),
+                "add": oead.byml.Array(added),
+                "mod": oead.byml.Hash(modified),
+                "del": oead.byml.Array(deleted),
             }
         )
 
-        for i, quest in enumerate(mod_quests):
-            quest_name = quest["Name"]
-            quest["prev_quest"] = mod_quests[i-1]["Name"] if i > 0 else "--index_zero"
-            if quest_name not in stock_names:
-                diffs["add"].append(quest)
-            elif quest != stock_quests[stock_names.index(quest_name)]:
-                diffs["mod"][quest_name] = quest
-
-        return diffs
+    def get_log_inputs(self, modded_files: List[Union[Path, str]]):
+        needle = (
+            f"{util.get_content_path()}/Pack/TitleBG.pack//"
+            "Quest/QuestProduct.sbquestpack"
+        )
+        return [needle] if needle in modded_files else []
 
     def log_diff(self, mod_dir: Path, diff_material):
         if isinstance(diff_material, list):
@@ -98,6 +152,7 @@ class QuestMerger(mergers.Merger):
             }
         )
         added_quests = set()
+        deleted_quests = set()
         for diff in reversed(diffs):
             for add in diff["add"]:
                 if add["Name"] not in added_quests:
@@ -106,8 +161,9 @@ class QuestMerger(mergers.Merger):
             for name, mod in diff["mod"].items():
                 all_diffs["mod"][name] = mod
             for delete in diff["del"]:
-                if delete not in all_diffs["del"]:
+                if delete not in deleted_quests:
                     all_diffs["del"].append(delete)
+                    deleted_quests.add(delete)
         return all_diffs
 
     @util.timed
@@ -136,39 +192,19 @@ class QuestMerger(mergers.Merger):
             return
         print("Loading stock quests...")
         quests = get_stock_quests()
-        stock_names = [q["Name"] for q in quests]
+        stock_names = mergers.index_records(quests, get_quest_name)
 
         print("Merging quest mods...")
         for name, mod in diffs["mod"].items():
-            try:
-                quests[stock_names.index(name)] = mod
-            except (IndexError, ValueError):
+            if name in stock_names:
+                quests[stock_names[name]] = mod
+            else:
                 diffs["add"].append(mod)
-        for delete in reversed(diffs["del"]):
-            try:
-                quests.remove(quests[stock_names.index(delete)])
-            except ValueError:
-                pass
-            except IndexError:
-                raise RuntimeError(
-                    f"An error occurred when attempting to remove a quest from your "
-                    "game. Most of the time this means the mod was accidentally made "
-                    "using the base game 1.0 TitleBG.pack instead of the latest updated "
-                    "version. Please contact the mod author for assistance."
-                )
-        added_names = set()
-        for add in diffs["add"]:
-            if add["Name"] not in added_names:
-                quest_index = len(quests)
-                try:
-                    quest_index = 0 if add["prev_quest"] == "--index_zero" else [q["Name"] for q in quests].index(add["prev_quest"]) + 1
-                    del add["prev_quest"]
-                except KeyError:
-                    pass
-                except ValueError:
-                    del add["prev_quest"]
-                quests.insert(quest_index, add)
-                added_names.add(add["Name"])
+        for i in sorted(
+            {stock_names[d] for d in diffs["del"] if d in stock_names}, reverse=True
+        ):
+            del quests[i]
+        quests = insert_quests(quests, diffs["add"])
 
         print("Writing new quest pack...")
         data = oead.byml.to_binary(quests, big_endian=util.get_settings("wiiu"))
@@ -85,17 +85,18 @@ def calculate_size(
         return 0
 
 
+@util.cached(*util.GAME_SETTINGS)
+def _read_stock_rstb() -> rstb.ResourceSizeTable:
+    return read_rstb(
+        str(
+            util.get_game_file("System/Resource/ResourceSizeTable.product.srsizetable")
+        ),
+        util.get_settings("wiiu"),
+    )
+
+
 def get_stock_rstb() -> rstb.ResourceSizeTable:
-    if not hasattr(get_stock_rstb, "table"):
-        get_stock_rstb.table = read_rstb(
-            str(
-                util.get_game_file(
-                    "System/Resource/ResourceSizeTable.product.srsizetable"
-                )
-            ),
-            util.get_settings("wiiu"),
-        )
-    return deepcopy(get_stock_rstb.table)
+    return deepcopy(_read_stock_rstb())
 
 
 def set_size(entry: str, size: int):
@@ -427,8 +427,9 @@ class ShopMerger(mergers.Merger):
         shop_merge_log = util.get_master_modpack_dir() / "logs" / "shop.log"
 
         print("Performing shop merge...")
+        util.advance_progress(self.NAME, 0, total=len(diffs))
         pool = self._pool or util.start_pool()
-        pool.starmap(merge_shop_files, diffs.items())
+        pool.starmap(util.progress_task(self.NAME, merge_shop_files), diffs.items())
 
         if not self._pool:
             pool.close()
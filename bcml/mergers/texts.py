@@ -8,7 +8,7 @@ from functools import partial, lru_cache
 from pathlib import Path
 from platform import system
 from tempfile import TemporaryDirectory, NamedTemporaryFile
-from typing import List, Union, Set, ByteString
+from typing import Dict, List, Optional, Union, Set, ByteString
 
 import oead
 import xxhash
@@ -83,6 +83,28 @@ def map_languages(dest_langs: Set[str], src_langs: Set[str]) -> dict:
     return lang_map
 
 
+def split_texts_log(log: Path) -> Dict[str, Path]:
+    """
+    Splits a texts log into one file per language in a `texts` folder next to it, so
+    that merges only need to load the languages they actually use
+
+    Returns: Dict[str, Path] - A dict of languages to their split log files
+    """
+    lang_dir = log.with_name("texts")
+    if lang_dir.is_dir() and lang_dir.stat().st_mtime_ns >= log.stat().st_mtime_ns:
+        return {f.stem: f for f in lang_dir.glob("*.json")}
+    lang_dir.mkdir(parents=True, exist_ok=True)
+    for old_log in lang_dir.glob("*.json"):
+        old_log.unlink()
+    lang_logs = {}
+    for lang, content in json.loads(log.read_text("utf-8")).items():
+        lang_logs[lang] = lang_dir / f"{lang}.json"
+        lang_logs[lang].write_text(
+            json.dumps(content, ensure_ascii=False), encoding="utf-8"
+        )
+    return lang_logs
+
+
 class TextsMerger(mergers.Merger):
     # pylint: disable=abstract-method
     """A merger for game texts"""
@@ -133,29 +155,64 @@ class TextsMerger(mergers.Merger):
 
         return language_diffs
 
+    def get_log_inputs(self, modded_files: List[Union[str, Path]]):
+        return [
+            file
+            for file in modded_files
+            if (
+                isinstance(file, Path)
+                and "Bootup_" in file.name
+                and "Graphic" not in file.name
+            )
+        ]
+
     def log_diff(self, mod_dir: Path, diff_material):
         if isinstance(diff_material, List):
             diff_material = self.generate_diff(mod_dir, diff_material)
         if diff_material:
-            (mod_dir / "logs" / self._log_name).write_text(
+            log = mod_dir / "logs" / self._log_name
+            log.write_text(
                 json.dumps(diff_material, ensure_ascii=False, indent=2),
                 encoding="utf-8",
             )
+            split_texts_log(log)
+
+    def _get_user_langs(self) -> Set[str]:
+        return (
+            {util.get_settings("lang")}
+            if not self._options["all_langs"]
+            else util.get_user_languages()
+        )
 
-    def get_mod_diff(self, mod: util.BcmlMod):
+    def get_mod_diff(self, mod: util.BcmlMod, langs: Optional[Set[str]] = None):
+        """
+        Gets the logged text diff for a mod, keyed by language. If `langs` is given,
+        only the logs needed to supply those languages are loaded, and the result is
+        keyed by the requested languages instead of the ones the mod has logged.
+        """
+        log_dirs = [mod.path / "logs"] if self.is_mod_logged(mod) else []
+        log_dirs.extend(
+            opt / "logs"
+            for opt in {d for d in (mod.path / "options").glob("*") if d.is_dir()}
+            if (opt / "logs" / self._log_name).exists()
+        )
+        lang_logs = [split_texts_log(d / self._log_name) for d in log_dirs]
+        mod_langs = {lang for logs in lang_logs for lang in logs}
+        if not mod_langs:
+            return {}
+        lang_map = (
+            map_languages(langs, mod_langs) if langs else {l: l for l in mod_langs}
+        )
         diff = {}
-        if self.is_mod_logged(mod):
-            util.dict_merge(
-                diff,
-                json.loads((mod.path / "logs" / self._log_name).read_text("utf-8")),
-            )
-        for opt in {d for d in (mod.path / "options").glob("*") if d.is_dir()}:
-            if (opt / "logs" / self._log_name).exists():
-                util.dict_merge(
-                    diff,
-                    json.loads((opt / "logs" / self._log_name).read_text("utf-8")),
-                    overwrite_lists=True,
-                )
+        for user_lang, mod_lang in lang_map.items():
+            diff[user_lang] = {}
+            for logs in lang_logs:
+                if mod_lang in logs:
+                    util.dict_merge(
+                        diff[user_lang],
+                        json.loads(logs[mod_lang].read_text("utf-8")),
+                        overwrite_lists=True,
+                    )
         return diff
 
     def get_mod_edit_info(self, mod: util.BcmlMod) -> set:
@@ -165,10 +222,10 @@ class TextsMerger(mergers.Merger):
                 diffs |= set(files.keys())
         return diffs
 
-    def get_all_diffs(self):
+    def get_all_diffs(self, langs: Optional[Set[str]] = None):
         diffs = []
         for mod in util.get_installed_mods():
-            diff = self.get_mod_diff(mod)
+            diff = self.get_mod_diff(mod, langs)
             if diff:
                 diffs.append(diff)
         return diffs
@@ -176,22 +233,21 @@ class TextsMerger(mergers.Merger):
     def consolidate_diffs(self, diffs: list):
         if not diffs:
             return {}
-        user_langs = (
-            {util.get_settings("lang")}
-            if not self._options["all_langs"]
-            else util.get_user_languages()
-        )
+        user_langs = self._get_user_langs()
 
         # copy diffs from langs mod has to langs user wants
         for diff in diffs:
+            if user_langs <= set(diff.keys()):
+                continue
             lang_map = map_languages(user_langs, set(diff.keys()))
             for user_lang, mod_lang in lang_map.items():
                 if user_lang not in diff:
                     diff[user_lang] = diff[mod_lang]
 
-        main_diff = diffs[0]
-        for diff in diffs[1:]:
-            for lang, content in diff.items():
+        main_diff = {}
+        for diff in diffs:
+            for lang in user_langs:
+                content = diff[lang]
                 if lang not in main_diff:
                     main_diff[lang] = content
                 else:
@@ -203,35 +259,44 @@ class TextsMerger(mergers.Merger):
                                 main_diff[lang][file][entry] = msg
         return main_diff
 
+    @staticmethod
+    def _merge_language(lang: str, diff: dict):
+        rsext.mergers.texts.merge_language(
+            json.dumps(diff),
+            str(util.get_game_file(f"Pack/Bootup_{lang}.pack")),
+            str(
+                util.get_master_modpack_dir()
+                / util.get_content_path()
+                / "Pack"
+                / f"Bootup_{lang}.pack"
+            ),
+            util.get_settings("wiiu"),
+        )
+        print(f"{lang} texts merged successfully")
+
     @util.timed
     def perform_merge(self):
         # pylint: disable=unsupported-assignment-operation
-        user_langs = (
-            {util.get_settings("lang")}
-            if not self._options["all_langs"]
-            else util.get_user_languages()
-        )
+        user_langs = self._get_user_langs()
         print("Loading text mods...")
-        diffs = self.consolidate_diffs(self.get_all_diffs())
+        diffs = self.consolidate_diffs(self.get_all_diffs(user_langs))
         if not diffs:
             print("No text merge necessary")
             for bootup in util.get_master_modpack_dir().rglob("**/Bootup_????.pack"):
                 bootup.unlink()
             return
 
-        for lang in user_langs:
-            rsext.mergers.texts.merge_language(
-                json.dumps(diffs[lang]),
-                str(util.get_game_file(f"Pack/Bootup_{lang}.pack")),
-                str(
-                    util.get_master_modpack_dir()
-                    / util.get_content_path()
-                    / "Pack"
-                    / f"Bootup_{lang}.pack"
-                ),
-                util.get_settings("wiiu"),
-            )
-            print(f"{lang} texts merged successfully")
+        # The Rust merger releases the GIL, so languages are merged side by side on
+        # threads
+        pool = self._pool or util.start_pool()
+        pool.starmap(
+            self._merge_language,
+            [(lang, diffs[lang]) for lang in user_langs],
+            release_gil=True,
+        )
+        if not self._pool:
+            pool.close()
+            pool.join()
 
     def get_checkbox_options(self) -> List[tuple]:
         return [
@@ -1,5 +1,6 @@
 import copyreg
-from typing import Union
+from contextlib import AbstractContextManager
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
 import oead
 
 
@@ -39,3 +40,110 @@ PICKLE_MAP = {
 
 for typ, func in PICKLE_MAP.items():
     copyreg.pickle(typ, func)
+
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:  # Python 3.7
+    SharedMemory = None  # type: ignore
+
+# The shared memory blocks this process has open, by name
+_BLOCKS: Dict[str, "SharedMemory"] = {}
+
+
+def _to_binary(obj) -> Tuple[str, bytes]:
+    if isinstance(obj, oead.aamp.ParameterIO):
+        return "pio", bytes(obj.to_binary())
+    if isinstance(obj, oead.aamp.ParameterList):
+        return "plist", pickle_plist(obj)[1][0]
+    return "byml", bytes(oead.byml.to_binary(obj, big_endian=False))
+
+
+def _from_binary(kind: str, data):
+    if kind == "pio":
+        return oead.aamp.ParameterIO.from_binary(data)
+    if kind == "plist":
+        return construct_plist(data)
+    return construct_byml(data)
+
+
+class Payload:
+    """
+    A handle to an oead object serialised into a shared memory block, which pickles
+    as just the block's name. ``get()`` parses the object straight from the block,
+    attaching to it the first time it is used in each process. Without shared memory
+    (Python 3.7), the serialised data travels with the handle instead.
+    """
+
+    __slots__ = ("kind", "size", "shm_name", "data")
+
+    def __init__(
+        self, kind: str, size: int, shm_name: Optional[str] = None, data: bytes = None
+    ):
+        self.kind = kind
+        self.size = size
+        self.shm_name = shm_name
+        self.data = data
+
+    def get(self):
+        if not self.shm_name:
+            return _from_binary(self.kind, self.data)
+        shm = _BLOCKS.get(self.shm_name)
+        if shm is None:
+            # pool workers share the owner's resource tracker, so attaching here does
+            # not hand the block's lifetime to this process
+            shm = _BLOCKS[self.shm_name] = SharedMemory(self.shm_name)
+        with shm.buf[: self.size] as view:
+            return _from_binary(self.kind, view)
+
+    def __reduce__(self):
+        return Payload, (self.kind, self.size, self.shm_name, self.data)
+
+
+def unwrap(obj):
+    """Gets the object behind a Payload, or returns anything else as it is"""
+    return obj.get() if isinstance(obj, Payload) else obj
+
+
+class SharedPayloads(AbstractContextManager):
+    """
+    Owns the shared memory blocks behind payloads sent to pool workers. Each object
+    is serialised and placed once per key, after which it can be handed to any
+    number of tasks for the cost of its handle. The blocks are freed by ``close()``
+    or when the context exits, which must be after the tasks using them are done.
+    """
+
+    _payloads: Dict[Hashable, Payload]
+
+    def __init__(self):
+        self._payloads = {}
+
+    def put(self, key: Hashable, load: Callable[[], Any]) -> Payload:
+        """Gets the payload for a key, calling ``load`` for its object the first time"""
+        payload = self._payloads.get(key)
+        if payload is None:
+            kind, data = _to_binary(load())
+            if SharedMemory is None:
+                payload = Payload(kind, len(data), data=data)
+            else:
+                shm = SharedMemory(create=True, size=max(1, len(data)))
+                shm.buf[: len(data)] = data
+                _BLOCKS[shm.name] = shm
+                payload = Payload(kind, len(data), shm_name=shm.name)
+            self._payloads[key] = payload
+        return payload
+
+    def close(self):
+        for payload in self._payloads.values():
+            shm = _BLOCKS.pop(payload.shm_name, None) if payload.shm_name else None
+            if shm is None:
+                continue
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._payloads.clear()
+
+    def __exit__(self, exctype, excinst, exctb):
+        self.close()
@@ -2,45 +2,66 @@
 # Copyright 2020 Nicene Nerd <macadamiadaze@gmail.com>
 # Licensed under GPLv3+
 import functools
-import gc
 import json
+import logging
+import logging.handlers
+import mmap
 import multiprocessing
+import multiprocessing.pool
 import os
 import re
 import shutil
 import socket
 import sys
+import traceback
 import urllib.error
 import urllib.request
 from base64 import b64decode
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser
-from contextlib import AbstractContextManager
+from contextlib import AbstractContextManager, contextmanager
 from copy import deepcopy
 from datetime import datetime
-from functools import lru_cache
-from io import StringIO
+from io import BytesIO, StringIO
 from multiprocessing import current_process
 from pathlib import Path
 from platform import system, python_version_tuple
 from pprint import pformat
+from queue import Queue
 from subprocess import run, PIPE
-from tempfile import mkdtemp
-from time import time_ns
-from typing import Union, List, Dict, ByteString, Tuple, Any, Optional, IO
-from xml.dom import minidom
+from tempfile import mkdtemp, mkstemp
+from threading import Event, RLock, Semaphore, Thread, Timer, get_ident
+from time import monotonic, time_ns
+from typing import (
+    TYPE_CHECKING,
+    Union,
+    List,
+    Dict,
+    ByteString,
+    Tuple,
+    Any,
+    Optional,
+    IO,
+    Deque,
+    Callable,
+    Iterator,
+    Sequence,
+    Hashable,
+)
 
 import oead
-import requests
 import xxhash  # pylint: disable=wrong-import-order
 from oead.aamp import ParameterIO, ParameterList  # pylint:disable=import-error
-from webview import Window  # pylint: disable=wrong-import-order
 
 from bcml import bcml as rsext, locks
 from bcml import pickles, DEBUG  # pylint: disable=unused-import
 from bcml.__version__ import VERSION
 
+if TYPE_CHECKING:
+    from webview import Window  # pylint: disable=wrong-import-order
+
 
 CREATE_NO_WINDOW = 0x08000000
 SARC_EXTS = {
@@ -396,6 +417,8 @@ class BcmlMod:
 
     def get_preview(self) -> Path:
         if self._preview is None:
+            import requests  # pylint: disable=import-outside-toplevel
+
             if not list(self.path.glob("thumbnail.*")):
                 if not self.image:
                     if self.url and "gamebanana.com" in self.url:
@@ -434,28 +457,389 @@ class BcmlMod:
             self._preview = self.path / image_path
         return self._preview
 
+    def has_preview(self) -> bool:
+        """Checks whether a preview exists or can be fetched, without fetching it"""
+        return bool(
+            self._preview
+            or list(self.path.glob("thumbnail.*"))
+            or self._info.get("image")
+            or "gamebanana.com" in self._info.get("url", "")
+        )
+
 
 decompress = oead.yaz0.decompress
 compress = oead.yaz0.compress
 
 
-def vprint(content):
-    if "Pool" in current_process().name:
-        return
-    if not isinstance(content, str):
+LOGGER = logging.getLogger("bcml")
+
+
+class _PrintHandler(logging.Handler):
+    """Prints log records to whatever sys.stdout is at the time"""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            prefix = "VERBOSE" if record.levelno <= logging.DEBUG else ""
+            print(f"{prefix}{self.format(record)}")
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+
+class _ForwardHandler(logging.Handler):
+    """Passes records forwarded from pool workers to the main process's logger"""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logging.getLogger(record.name).handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord):
+        pass
+
+
+class _LazyContent:
+    """Defers rendering a verbose payload until a handler actually formats it"""
+
+    __slots__ = ("content",)
+
+    def __init__(self, content):
+        self.content = content
+
+    def __str__(self) -> str:
+        content = self.content
+        if callable(content):
+            content = content()
+        if isinstance(content, str):
+            return content
         if isinstance(content, (oead.byml.Hash, oead.byml.Array)):
-            content = oead.byml.to_text(content)
-        elif isinstance(content, oead.aamp.ParameterIO):
-            content = content.to_text()
-        else:
+            return oead.byml.to_text(content)
+        if isinstance(content, oead.aamp.ParameterIO):
+            return content.to_text()
+        try:
+            return json.dumps(content, ensure_ascii=False, indent=2)
+        except:  # pylint: disable=bare-except
             try:
-                content = json.dumps(content, ensure_ascii=False, indent=2)
+                return pformat(content, compact=True, indent=2)
             except:  # pylint: disable=bare-except
-                try:
-                    content = pformat(content, compact=True, indent=2)
-                except:  # pylint: disable=bare-except
-                    return
-    print(f"VERBOSE{content}")
+                return repr(content)
+
+
+def set_verbose(verbose: bool):
+    """Turns verbose (debug level) output on or off for this process"""
+    LOGGER.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+
+def get_log_queue() -> multiprocessing.Queue:
+    """
+    Gets the queue which pool workers send their log records through, starting the
+    listener which hands them to the main process's logger
+    """
+    if not hasattr(get_log_queue, "queue"):
+        queue = multiprocessing.Queue(-1)
+        listener = logging.handlers.QueueListener(queue, _ForwardHandler())
+        listener.start()
+        get_log_queue.queue = queue
+        get_log_queue.listener = listener
+    return get_log_queue.queue
+
+
+def _init_worker(
+    queue: multiprocessing.Queue,
+    level: int,
+    progress_level: int = logging.WARNING,
+    cancel_event=None,
+    settings: Optional[dict] = None,
+):
+    if settings is not None:
+        # Workers get the parent's settings at the moment the pool started, so they
+        # agree with it even inside a TempSettingsContext, without reading any files
+        setattr(get_settings, "settings", settings)
+        CACHES.settings_changed(settings)
+        _push_settings()
+    if cancel_event is not None:
+        get_cancel_event.event = cancel_event
+    LOGGER.handlers.clear()
+    LOGGER.addHandler(logging.handlers.QueueHandler(queue))
+    LOGGER.setLevel(level)
+    LOGGER.propagate = False
+    # progress records go up to the queue and are tallied by the main process
+    PROGRESS.handlers.clear()
+    PROGRESS.setLevel(progress_level)
+    PROGRESS.propagate = True
+
+
+def vprint(content):
+    """
+    Logs verbose output. Objects (or a callable producing one) are only rendered to
+    text if verbose output is enabled, so they can be passed freely.
+    """
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug("%s", _LazyContent(content))
+
+
+PROGRESS = logging.getLogger("bcml.progress")
+
+
+class _ProgressHandler(logging.Handler):
+    """
+    Keeps a running tally of each progress phase and passes events on to the
+    progress listeners. Updates within a phase are sent at most every ``interval``
+    seconds, but starts, ends and completed totals always are.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        super().__init__()
+        self.interval = interval
+        self.listeners: List[Callable[[dict], None]] = []
+        self.phases: Dict[str, dict] = {}
+
+    def emit(self, record: logging.LogRecord):
+        kind, phase, done, total, nbytes, label = record.progress  # type: ignore
+        now = monotonic()
+        state = self.phases.get(phase)
+        if kind == "start":
+            state = self.phases[phase] = {
+                "label": label or phase,
+                "done": 0,
+                "total": total,
+                "bytes": 0,
+                "start": now,
+                "sent": 0.0,
+            }
+        elif state is None:
+            # a worker's update arriving after its phase already ended
+            return
+        if total is not None:
+            state["total"] = total
+        state["done"] += done
+        state["bytes"] += nbytes
+        if kind == "end":
+            del self.phases[phase]
+        elif (
+            kind == "advance"
+            and now - state["sent"] < self.interval
+            and state["done"] != state["total"]
+        ):
+            return
+        state["sent"] = now
+        event = {
+            "event": {"start": "phase_start", "end": "phase_end"}.get(kind, "progress"),
+            "phase": phase,
+            "label": state["label"],
+            "done": state["done"],
+            "total": state["total"],
+            "bytes": state["bytes"],
+            "percent": round(min(state["done"] / state["total"], 1) * 100, 1)
+            if state["total"]
+            else None,
+            "elapsed": round(now - state["start"], 3),
+        }
+        for listener in list(self.listeners):
+            try:
+                listener(event)
+            except Exception:  # pylint: disable=broad-except
+                self.handleError(record)
+
+
+def _publish_progress(
+    kind: str,
+    phase: str,
+    done: int = 0,
+    total: Optional[int] = None,
+    nbytes: int = 0,
+    label: Optional[str] = None,
+):
+    if PROGRESS.isEnabledFor(logging.INFO):
+        PROGRESS.info(
+            "%s %s",
+            kind,
+            phase,
+            extra={"progress": (kind, phase, done, total, nbytes, label)},
+        )
+
+
+def add_progress_listener(listener: Callable[[dict], None]):
+    """
+    Subscribes to progress events from this process and its pool workers. Each
+    event is a dict with the ``event`` type (``phase_start``, ``progress`` or
+    ``phase_end``), the ``phase`` and its ``label``, the ``done`` and ``total``
+    item counts, ``bytes`` processed, ``percent`` (if the total is known) and the
+    ``elapsed`` seconds since the phase started.
+    """
+    _PROGRESS_HANDLER.listeners.append(listener)
+    PROGRESS.setLevel(logging.INFO)
+
+
+def remove_progress_listener(listener: Callable[[dict], None]):
+    try:
+        _PROGRESS_HANDLER.listeners.remove(listener)
+    except ValueError:
+        pass
+    if not _PROGRESS_HANDLER.listeners:
+        PROGRESS.setLevel(logging.WARNING)
+
+
+@contextmanager
+def progress_phase(phase: str, total: Optional[int] = None, label: str = None):
+    """Publishes the start and end of a phase of work around the wrapped block"""
+    _publish_progress("start", phase, total=total, label=label)
+    try:
+        yield
+    finally:
+        _publish_progress("end", phase)
+
+
+def advance_progress(
+    phase: str, done: int = 1, total: Optional[int] = None, nbytes: int = 0
+):
+    """
+    Records that some items (and optionally bytes) of a phase have been processed,
+    or sets the phase's total if it was not known when it started. This can be
+    called from pool workers as well as the main process.
+    """
+    _publish_progress("advance", phase, done, total, nbytes)
+
+
+def progress_iter(phase: str, items: Sequence, label: str = None) -> Iterator:
+    """
+    Iterates over items inside a progress phase, advancing it as each one is done.
+    Each item is also a cancellation point.
+    """
+    with progress_phase(phase, len(items), label):
+        for item in items:
+            check_cancelled()
+            yield item
+            advance_progress(phase)
+
+
+def _run_progress_task(phase: str, func: Callable, *args, **kwargs):
+    check_cancelled()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        advance_progress(phase)
+
+
+def progress_task(phase: str, func: Callable) -> Callable:
+    """
+    Wraps a function to be mapped over a pool so that each call advances a progress
+    phase from the worker which runs it. The function must be picklable as usual.
+    Once the operation is cancelled, the remaining tasks raise Cancelled instead.
+    """
+    return functools.partial(_run_progress_task, phase, func)
+
+
+class Cancelled(Exception):
+    """Raised at the next task boundary after the running operation is cancelled"""
+
+
+def get_cancel_event():
+    """Gets the event which cancels the running operation, shared with pool workers"""
+    if not hasattr(get_cancel_event, "event"):
+        get_cancel_event.event = multiprocessing.Event()
+    return get_cancel_event.event
+
+
+def cancel() -> bool:
+    """
+    Asks the running install or merge to stop at its next task boundary. Does nothing
+    if no cancellable operation is running, so that a stray cancel cannot stop the
+    next one. Returns whether there was an operation to cancel.
+    """
+    if not CancelContext._depth:  # pylint: disable=protected-access
+        vprint("Nothing to cancel")
+        return False
+    get_cancel_event().set()
+    return True
+
+
+def check_cancelled():
+    if get_cancel_event().is_set():
+        raise Cancelled("The operation was cancelled.")
+
+
+class CancelContext(AbstractContextManager):
+    """
+    Runs an operation which stops at its next task boundary once cancel() is called,
+    or once it has run for longer than an optional time budget in seconds. When the
+    budget runs out, a partial trace of the phases finished and still running, and of
+    the stack at that moment, is saved to budget_trace.json in the data folder.
+    """
+
+    _depth = 0
+    budget: Optional[float]
+    trace: Optional[dict]
+
+    def __init__(self, budget: Optional[float] = None):
+        self.budget = budget
+        self.trace = None
+        self._timer: Optional[Timer] = None
+        self._thread = get_ident()
+        self._finished: List[dict] = []
+        self._running: Dict[str, dict] = {}
+
+    def _record(self, event: dict):
+        if event["event"] == "phase_end":
+            self._running.pop(event["phase"], None)
+            self._finished.append(event)
+        else:
+            self._running[event["phase"]] = event
+
+    def _expire(self):
+        frame = sys._current_frames().get(self._thread)  # pylint: disable=protected-access
+        self.trace = {
+            "budget": self.budget,
+            "finished": list(self._finished),
+            "running": list(self._running.values()),
+            "stack": traceback.format_stack(frame) if frame else [],
+        }
+        cancel()
+
+    def __enter__(self):
+        CancelContext._depth += 1
+        if CancelContext._depth == 1:
+            get_cancel_event().clear()
+        if self.budget:
+            self._thread = get_ident()
+            add_progress_listener(self._record)
+            self._timer = Timer(self.budget, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+        return self
+
+    def __exit__(self, exctype, excinst, exctb):
+        CancelContext._depth -= 1
+        if self._timer:
+            self._timer.cancel()
+            remove_progress_listener(self._record)
+        if self.trace:
+            trace_file = get_data_dir() / "budget_trace.json"
+            trace_file.write_text(json.dumps(self.trace, indent=2), encoding="utf-8")
+            print(
+                f"The time budget of {self.budget} seconds ran out. A trace of the "
+                f"work done so far was saved to {trace_file}"
+            )
+        if CancelContext._depth == 0:
+            get_cancel_event().clear()
+
+
+def cancellable(func):
+    @functools.wraps(func)
+    def cancellable_function(*args, **kwargs):
+        with CancelContext():
+            return func(*args, **kwargs)
+
+    return cancellable_function
+
+
+_PROGRESS_HANDLER = _ProgressHandler()
+
+if not LOGGER.handlers:
+    LOGGER.addHandler(_PrintHandler())
+    LOGGER.propagate = False
+    set_verbose(DEBUG)
+    PROGRESS.addHandler(_PROGRESS_HANDLER)
+    PROGRESS.propagate = False
+    PROGRESS.setLevel(logging.WARNING)
 
 
 def timed(func):
@@ -468,16 +852,439 @@ def timed(func):
     return timed_function
 
 
+# The settings which decide where stock game files are found
+GAME_SETTINGS = (
+    "wiiu",
+    "game_dir",
+    "game_dir_nx",
+    "update_dir",
+    "dlc_dir",
+    "dlc_dir_nx",
+)
+
+
+class CacheRegistry:
+    """
+    Keeps track of BCML's caches and the settings each depends on. Every setting has
+    a generation number, bumped whenever its value changes, and a change clears
+    exactly the caches which declared that setting. Caches can be any object with
+    ``name`` and ``settings`` attributes and ``cache_clear()`` and ``stats()``
+    methods.
+    """
+
+    def __init__(self):
+        self._caches: Dict[str, Any] = {}
+        self._generations: Dict[str, int] = {}
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self.generation = 0
+
+    def register(self, cache: Any) -> Any:
+        self._caches[cache.name] = cache
+        return cache
+
+    def get_generation(self, *settings: str) -> int:
+        """Gets the generation of the newest change to any of the given settings"""
+        return max((self._generations.get(s, 0) for s in settings), default=0)
+
+    def settings_changed(self, settings: Dict[str, Any]):
+        """
+        Compares the settings with the values last seen, bumping the generation of
+        any which changed and clearing the caches which depend on them
+        """
+        if self._snapshot is None:
+            self._snapshot = dict(settings)
+            return
+        changed = {
+            key
+            for key in settings.keys() | self._snapshot.keys()
+            if settings.get(key) != self._snapshot.get(key)
+        }
+        self._snapshot = dict(settings)
+        if not changed:
+            return
+        self.generation += 1
+        for key in changed:
+            self._generations[key] = self.generation
+        for cache in self._caches.values():
+            stale = changed & cache.settings
+            if stale:
+                vprint(f"Clearing {cache.name} cache for new {', '.join(stale)}")
+                cache.cache_clear()
+
+    def clear(self):
+        for cache in self._caches.values():
+            cache.cache_clear()
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: dict(cache.stats(), generation=self.get_generation(*cache.settings))
+            for name, cache in sorted(self._caches.items())
+        }
+
+
+CACHES = CacheRegistry()
+
+
+class _FunctionCache:
+    """Results cached for one function, with its hit and miss counts"""
+
+    def __init__(self, name: str, settings: Sequence[str], maxsize: Optional[int]):
+        self.name = name
+        self.settings = frozenset(settings)
+        self.maxsize = maxsize
+        self.results: "OrderedDict[Any, Any]" = OrderedDict()
+        self.lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_clear(self):
+        with self.lock:
+            self.results.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.results),
+            "settings": sorted(self.settings),
+        }
+
+
+def cached(*settings: str, maxsize: Optional[int] = None):
+    """
+    Caches a function's results by its arguments, like ``lru_cache``, in a cache
+    which is registered with ``CACHES`` and cleared when any of the named settings
+    changes
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache = CACHES.register(
+            _FunctionCache(f"{func.__module__}.{func.__qualname__}", settings, maxsize)
+        )
+        missing = object()
+
+        @functools.wraps(func)
+        def cached_func(*args, **kwargs):
+            key = (args, tuple(kwargs.items())) if kwargs else args
+            result = cache.results.get(key, missing)
+            if result is not missing:
+                cache.hits += 1
+                if maxsize:
+                    with cache.lock:
+                        if key in cache.results:
+                            cache.results.move_to_end(key)
+                return result
+            cache.misses += 1
+            result = func(*args, **kwargs)
+            with cache.lock:
+                cache.results[key] = result
+                if maxsize and len(cache.results) > maxsize:
+                    cache.results.popitem(last=False)
+            return result
+
+        setattr(cached_func, "cache_clear", cache.cache_clear)
+        setattr(cached_func, "cache_stats", cache.stats)
+        return cached_func
+
+    return decorator
+
+
 def clear_all_caches():
-    gc.collect()
-    for wrap in {
-        a for a in gc.get_objects() if isinstance(a, functools._lru_cache_wrapper)
-    }:
-        wrap.cache_clear()
+    """Clears every registered cache, whatever settings it depends on"""
+    CACHES.clear()
+
+
+def get_cache_stats() -> Dict[str, dict]:
+    """
+    Gets the hits, misses, size and settings dependencies of every cache, and the
+    generation of the last settings change which cleared it
+    """
+    return CACHES.stats()
+
+
+# Rough memory use of one worker process once it has stock files loaded
+WORKER_MEMORY_MB = 384
+# Batches this small run in-process, since spawning workers would take longer
+SERIAL_MAX_ITEMS = 4
+SERIAL_MAX_BYTES = 8 * 1024 * 1024
+# Items at least this big on average are handed to workers one at a time
+LARGE_ITEM_BYTES = 1024 * 1024
+
+
+def get_worker_count() -> int:
+    """
+    Gets the number of parallel workers to use, within the CPU count and the
+    user's worker and memory limits
+    """
+    workers = min(63, os.cpu_count() or 1)
+    if get_settings("pool_workers"):
+        workers = min(workers, int(get_settings("pool_workers")))
+    if get_settings("pool_memory_mb"):
+        workers = min(
+            workers, int(get_settings("pool_memory_mb")) // WORKER_MEMORY_MB
+        )
+    return max(1, workers)
+
+
+def _estimate_size(item: Any) -> Optional[int]:
+    """
+    Estimates the bytes a task will work on from the data or files it is given, or
+    returns None if any part of it, such as a parsed document, cannot be sized cheaply
+    """
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        return len(item)
+    if isinstance(item, pickles.Payload):
+        return item.size
+    if isinstance(item, (Path, str)):
+        try:
+            return os.stat(item).st_size
+        except (OSError, ValueError):
+            return None
+    if isinstance(item, tuple):
+        size = 0
+        for value in item:
+            value_size = _estimate_size(value)
+            if value_size is None:
+                return None
+            size += value_size
+        return size
+    return None
+
+
+def _call_indexed(func: Callable, star: bool, pair: Tuple[int, Any]) -> Tuple[int, Any]:
+    index, item = pair
+    return index, func(*item) if star else func(item)
+
+
+def _bounded_map(
+    threads: ThreadPoolExecutor, call: Callable, items: Iterator, window: int
+) -> Iterator:
+    """Like ``threads.map``, but only takes items while fewer than window are running"""
+    pending: Deque = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(threads.submit(call, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+class Executor(AbstractContextManager):
+    """
+    Runs batches of tasks serially, on threads, or in worker processes, choosing
+    for each batch from its item count and estimated size in bytes. Only batches
+    known to be small run serially. Batches of work which releases the GIL, such as
+    the Rust mergers, are marked with ``release_gil=True`` and run on threads, since
+    nothing then needs pickling. Worker processes are started on the first batch
+    which needs them. Offers the parts of the `multiprocessing.Pool` interface which
+    BCML uses.
+
+    Sized inputs, such as lists, are read up front so that the biggest tasks can be
+    started first. Iterators are kept lazy: items are taken from them only as tasks
+    are started, in order. With ``max_pending``, at most that many tasks are started
+    but not yet consumed at once, which bounds memory when each task's input or
+    result is large.
+    """
+
+    def __init__(self, processes: int = 0):
+        self.processes = processes or get_worker_count()
+        self._pool: Optional[multiprocessing.pool.Pool] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._payloads: Optional[pickles.SharedPayloads] = None
+        self._stopping = Event()
+
+    def _get_pool(self) -> multiprocessing.pool.Pool:
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                processes=self.processes,
+                maxtasksperchild=500,
+                initializer=_init_worker,
+                initargs=(
+                    get_log_queue(),
+                    LOGGER.getEffectiveLevel(),
+                    PROGRESS.getEffectiveLevel(),
+                    get_cancel_event(),
+                    dict(get_settings()),
+                ),
+            )
+        return self._pool
+
+    def _get_threads(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self.processes)
+        return self._threads
+
+    def share(self, key: Hashable, load: Callable[[], Any]) -> pickles.Payload:
+        """
+        Gets a handle to an oead object placed in shared memory for this pool's
+        tasks, calling ``load`` for the object only the first time its key is
+        shared. Tasks get the object back with ``pickles.unwrap``. The memory is
+        freed when the pool is joined or terminated.
+        """
+        if self._payloads is None:
+            self._payloads = pickles.SharedPayloads()
+        return self._payloads.put(key, load)
+
+    def _free_payloads(self):
+        if self._payloads is not None:
+            self._payloads.close()
+            self._payloads = None
+
+    def _choose_backend(
+        self, count: Optional[int], nbytes: Optional[int], release_gil: bool
+    ) -> str:
+        if self.processes == 1 or (count is not None and count <= 1):
+            return "serial"
+        if (
+            count is not None
+            and nbytes is not None
+            and count <= SERIAL_MAX_ITEMS
+            and nbytes <= SERIAL_MAX_BYTES
+        ):
+            return "serial"
+        if release_gil:
+            return "thread"
+        return "process"
+
+    def _run(
+        self,
+        func: Callable,
+        iterable,
+        star: bool,
+        chunksize: Optional[int],
+        release_gil: bool = False,
+        max_pending: Optional[int] = None,
+    ) -> Iterator[Tuple[int, Any]]:
+        call = functools.partial(_call_indexed, func, star)
+        if not hasattr(iterable, "__len__"):
+            backend = self._choose_backend(None, None, release_gil)
+            return self._stream(
+                call, enumerate(iterable), backend, chunksize or 1, max_pending
+            )
+        pairs = list(enumerate(iterable))
+        sizes = [_estimate_size(item) for _, item in pairs]
+        nbytes = None if None in sizes else sum(sizes)  # type: ignore
+        if nbytes:
+            # Start on the biggest tasks first, so that no worker is left
+            # finishing a big one alone at the end
+            pairs.sort(key=lambda pair: sizes[pair[0]], reverse=True)
+        backend = self._choose_backend(len(pairs), nbytes, release_gil)
+        if not chunksize:
+            chunksize = (
+                1
+                if nbytes and nbytes // len(pairs) >= LARGE_ITEM_BYTES
+                else max(1, len(pairs) // (self.processes * 4))
+            )
+        return self._stream(call, iter(pairs), backend, chunksize, max_pending)
+
+    def _stream(
+        self,
+        call: Callable,
+        pairs: Iterator,
+        backend: str,
+        chunksize: int,
+        max_pending: Optional[int],
+    ) -> Iterator[Tuple[int, Any]]:
+        if backend == "serial":
+            return map(call, pairs)
+        if backend == "thread":
+            return _bounded_map(
+                self._get_threads(), call, pairs, max_pending or self.processes * 4
+            )
+        if max_pending:
+            return self._imap_windowed(
+                call, pairs, min(chunksize, max_pending), max_pending
+            )
+        return self._get_pool().imap_unordered(call, pairs, chunksize)
+
+    def _imap_windowed(
+        self, call: Callable, pairs: Iterator, chunksize: int, max_pending: int
+    ) -> Iterator[Tuple[int, Any]]:
+        # The pool takes tasks on its own thread, which waits here for a free slot.
+        # A slot is freed as each result is consumed.
+        slots = Semaphore(max_pending)
+        done = Event()
+
+        def feed() -> Iterator:
+            for pair in pairs:
+                while not slots.acquire(timeout=0.1):
+                    if done.is_set() or self._stopping.is_set():
+                        return
+                yield pair
+
+        try:
+            for result in self._get_pool().imap_unordered(call, feed(), chunksize):
+                slots.release()
+                yield result
+        finally:
+            done.set()
+
+    def map(
+        self,
+        func: Callable,
+        iterable,
+        chunksize: Optional[int] = None,
+        release_gil: bool = False,
+    ) -> list:
+        results = {}
+        for index, result in self._run(func, iterable, False, chunksize, release_gil):
+            results[index] = result
+        return [results[i] for i in range(len(results))]
+
+    def starmap(
+        self,
+        func: Callable,
+        iterable,
+        chunksize: Optional[int] = None,
+        release_gil: bool = False,
+    ) -> list:
+        results = {}
+        for index, result in self._run(func, iterable, True, chunksize, release_gil):
+            results[index] = result
+        return [results[i] for i in range(len(results))]
+
+    def imap_unordered(
+        self,
+        func: Callable,
+        iterable,
+        chunksize: Optional[int] = None,
+        release_gil: bool = False,
+        max_pending: Optional[int] = None,
+    ) -> Iterator:
+        return (
+            result
+            for _, result in self._run(
+                func, iterable, False, chunksize, release_gil, max_pending
+            )
+        )
 
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
 
-def start_pool():
-    return multiprocessing.Pool(processes=min(63, os.cpu_count()), maxtasksperchild=500)
+    def join(self):
+        if self._pool is not None:
+            self._pool.join()
+        if self._threads is not None:
+            self._threads.shutdown(wait=True)
+            self._threads = None
+        self._free_payloads()
+
+    def terminate(self):
+        self._stopping.set()
+        if self._pool is not None:
+            self._pool.terminate()
+        if self._threads is not None:
+            self._threads.shutdown(wait=False)
+            self._threads = None
+        self._free_payloads()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.terminate()
+
+
+def start_pool() -> Executor:
+    return Executor()
 
 
 def sanity_check():
@@ -500,12 +1307,12 @@ def sanity_check():
         get_cemu_dir()
 
 
-@lru_cache(1)
+@cached(maxsize=1)
 def get_exec_dir() -> Path:
     return Path(os.path.dirname(os.path.realpath(__file__)))
 
 
-@lru_cache(2)
+@cached(maxsize=2)
 def get_python_exe(gui: bool) -> Path:
     embedded = [
         d
@@ -525,12 +1332,12 @@ def get_python_exe(gui: bool) -> Path:
             return sys.executable
 
 
-@lru_cache(1)
+@cached(maxsize=1)
 def get_is_portable_mode() -> bool:
     return "--portable" in sys.argv
 
 
-@lru_cache(None)
+@cached()
 def get_data_dir() -> Path:
     if get_is_portable_mode():
         data_dir = Path(os.getcwd()) / "bcml-data"
@@ -555,7 +1362,7 @@ def get_storage_dir() -> Path:
     return store_dir
 
 
-@lru_cache(None)
+@cached()
 def get_work_dir() -> Path:
     work_dir = get_data_dir() / "work_dir"
     if not work_dir.exists():
@@ -601,6 +1408,10 @@ DEFAULT_SETTINGS = {
     "strip_gfx": False,
     "auto_gb": True,
     "show_gb": False,
+    "sarc_cache_mb": 256,
+    "bnp_build_cache": True,
+    "pool_workers": 0,
+    "pool_memory_mb": 0,
 }
 
 
@@ -614,11 +1425,7 @@ def get_settings(name: str = "") -> Any:
                 with settings_path.open("w", encoding="utf-8") as s_file:
                     json.dump(settings, s_file)
             else:
-                tmp_settings_path = get_data_dir() / "tmp_settings.json"
-                if tmp_settings_path.exists():
-                    settings.update(json.loads(tmp_settings_path.read_text()))
-                else:
-                    settings.update(json.loads(settings_path.read_text()))
+                settings.update(json.loads(settings_path.read_text()))
                 for k, v in DEFAULT_SETTINGS.items():
                     if k not in settings:
                         settings[k] = v
@@ -631,6 +1438,7 @@ def get_settings(name: str = "") -> Any:
                         / "BreathOfTheWild_BCML"
                     )
             setattr(get_settings, "settings", settings)
+            CACHES.settings_changed(settings)
         if name:
             return getattr(get_settings, "settings", {}).get(name, False)
         return getattr(get_settings, "settings", {})
@@ -639,10 +1447,16 @@ def get_settings(name: str = "") -> Any:
 
 
 def save_settings():
+    CACHES.settings_changed(get_settings())
     with (get_data_dir() / "settings.json").open("w", encoding="utf-8") as s_file:
         json.dump(get_settings.settings, s_file, indent=2)
 
 
+def _push_settings():
+    """Hands the current settings to the Rust extension"""
+    rsext.set_settings(json.dumps(get_settings()))
+
+
 def get_cemu_dir() -> Path:
     cemu_dir = str(get_settings("cemu_dir"))
     if not cemu_dir or not Path(cemu_dir).is_dir():
@@ -657,6 +1471,8 @@ def set_cemu_dir(path: Path):
 
 
 def parse_cemu_settings(path: Path = None):
+    from xml.dom import minidom  # pylint: disable=import-outside-toplevel
+
     path = path or get_cemu_dir() / "settings.xml"
     if not path.exists():
         raise FileNotFoundError("The Cemu settings file could not be found.")
@@ -708,7 +1524,7 @@ def guess_game_dir(mlc_dir: Path) -> Optional[Path]:
     return None
 
 
-@lru_cache(None)
+@cached(*GAME_SETTINGS)
 def get_title_id(game_dir: Path = None) -> Tuple[str, str]:
     title_id = "00050000101C9400"
     if not game_dir:
@@ -737,7 +1553,7 @@ def guess_update_dir(mlc_dir: Path, game_dir: Path) -> Optional[Path]:
     return None
 
 
-@lru_cache(None)
+@cached(*GAME_SETTINGS)
 def get_update_dir() -> Path:
     if not get_settings("wiiu"):
         return get_game_dir()
@@ -808,6 +1624,11 @@ def get_user_languages(folder: Optional[Path] = None) -> set:
 
 
 class TempSettingsContext(AbstractContextManager):
+    """
+    Overrides some settings in this process and its Rust extension until the context
+    exits. Pools started inside the context get the overridden settings too.
+    """
+
     _settings: dict
     _tmp_settings: dict
 
@@ -816,17 +1637,14 @@ class TempSettingsContext(AbstractContextManager):
         self._tmp_settings = tmp_settings
 
     def __enter__(self):
-        clear_all_caches()
         getattr(get_settings, "settings").update(self._tmp_settings)
-        with (get_data_dir() / "tmp_settings.json").open(
-            "w", encoding="utf-8"
-        ) as s_file:
-            json.dump(get_settings.settings, s_file, indent=2)
+        CACHES.settings_changed(get_settings())
+        _push_settings()
 
     def __exit__(self, exctype, excinst, exctb):
         setattr(get_settings, "settings", self._settings)
-        clear_all_caches()
-        (get_data_dir() / "tmp_settings.json").unlink()
+        CACHES.settings_changed(self._settings)
+        _push_settings()
 
 
 class TempModContext(TempSettingsContext):
@@ -912,12 +1730,109 @@ def parse_profile_file(profile_file: Path) -> Dict[str, str]:
     return {"name": profile_data[0]}
 
 
+# Files and folders BCML rewrites in place, which must not share hard links with a
+# profile snapshot
+SNAPSHOT_COPIED_FILES = {"info.json", "rules.txt", ".profile"}
+SNAPSHOT_COPIED_FOLDERS = {"9999_BCML"}
+
+
+def replace_file(path: Path, data: Union[str, bytes]):
+    """
+    Writes a file by replacing it rather than rewriting it in place, so that hard
+    links to the old file, like those in profile snapshots, keep the old contents
+    """
+    handle, tmp_name = mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as tmp_file:
+            tmp_file.write(data.encode("utf-8") if isinstance(data, str) else data)
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        else:
+            os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _link_or_copy(src: str, dst: str, link: bool = True) -> str:
+    if link and os.path.basename(src) not in SNAPSHOT_COPIED_FILES:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
+def get_tree_signature(folder: Path) -> frozenset:
+    """
+    Gets the relative path (with forward slashes), size and modified time of every file
+    in a folder
+    """
+    signature = set()
+    for root, _, files in os.walk(folder):
+        for file in files:
+            path = os.path.join(root, file)
+            stat = os.stat(path)
+            signature.add(
+                (
+                    os.path.relpath(path, folder).replace(os.sep, "/"),
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                )
+            )
+    return frozenset(signature)
+
+
+def sync_snapshot(src: Path, dest: Path):
+    """
+    Makes one mod folder match another, e.g. when switching or saving profiles. Only
+    the top level folders which differ are replaced, and their files are hard linked
+    rather than copied where possible. Anything which later changes a file in a mod
+    folder must therefore either be listed in SNAPSHOT_COPIED_FILES or write it with
+    replace_file().
+    """
+    can_link = not get_settings("no_hardlinks")
+    dest.mkdir(parents=True, exist_ok=True)
+    src_entries = {entry.name: entry for entry in src.iterdir()}
+    for entry in dest.iterdir():
+        if entry.name not in src_entries:
+            if entry.is_dir():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
+    for name, entry in src_entries.items():
+        target = dest / name
+        if entry.is_dir():
+            if target.is_dir():
+                if get_tree_signature(entry) == get_tree_signature(target):
+                    continue
+                shutil.rmtree(target)
+            elif target.exists():
+                target.unlink()
+            shutil.copytree(
+                entry,
+                target,
+                copy_function=functools.partial(
+                    _link_or_copy,
+                    link=can_link and name not in SNAPSHOT_COPIED_FOLDERS,
+                ),
+            )
+        else:
+            if target.is_dir():
+                shutil.rmtree(target)
+            shutil.copy2(entry, target)
+
+
 def set_profile(profile_name: str) -> None:
-    profile_path = get_profile_path(profile_name)
+    profile_path = Path(get_profile_path(profile_name))
     mod_dir = get_modpack_dir()
     with locks.mod_dir:
-        shutil.rmtree(mod_dir)
-        shutil.copytree(profile_path, mod_dir)
+        sync_snapshot(profile_path, mod_dir)
 
 
 def delete_profile(profile_name: str) -> None:
@@ -935,13 +1850,11 @@ def save_profile(profile_name: str) -> None:
     profile_file = mod_dir / ".profile"
     profile_file.write_text("\t".join(profile_data))
     profile_dir = get_profiles_dir() / get_safe_pathname(profile_name)
-    if profile_dir.exists():
-        shutil.rmtree(profile_dir)
     with locks.mod_dir:
-        shutil.copytree(mod_dir, profile_dir)
+        sync_snapshot(mod_dir, profile_dir)
 
 
-@lru_cache(None)
+@cached(*GAME_SETTINGS)
 def get_game_file(path: Union[Path, str], aoc: bool = False) -> Path:
     if str(path).replace("\\", "/").startswith(f"{get_content_path()}/"):
         path = Path(str(path).replace("\\", "/").replace(f"{get_content_path()}/", ""))
@@ -981,25 +1894,148 @@ def get_game_file(path: Union[Path, str], aoc: bool = False) -> Path:
     raise FileNotFoundError(f"File {str(path)} was not found in game dump.")
 
 
+class SarcTable(dict):
+    """
+    A SARC's file table of names to views of their data. It holds the SARC and its
+    data, so the views stay valid for as long as the table is in use, even if it was
+    never cached or has since been evicted.
+    """
+
+    __slots__ = ("data", "sarc")
+
+
+class SarcCache:
+    """
+    A process-wide LRU cache of decompressed SARC containers, bounded by the total size
+    of the decompressed data it holds. Entries are keyed by the resolved path, size and
+    mtime of the outer file plus the chain of nested SARCs leading to the container, so
+    any change to the file on disk naturally misses the cache.
+    """
+
+    name = "sarc"
+    settings = frozenset({"sarc_cache_mb", "pool_workers", "pool_memory_mb"})
+    _budget: Optional[int]
+    _fixed_budget: bool
+    _size: int
+    _entries: "OrderedDict[tuple, Tuple[bytes, oead.Sarc, SarcTable]]"
+
+    def __init__(self, budget: Optional[int] = None):
+        self._budget = budget
+        self._fixed_budget = budget is not None
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def budget(self) -> int:
+        """The maximum number of decompressed bytes to keep in the cache"""
+        if self._budget is None:
+            budget = int(get_settings("sarc_cache_mb") or 0) * 1024 * 1024
+            if "Pool" in current_process().name:
+                budget //= get_worker_count()
+            self._budget = budget
+        return self._budget
+
+    def set_budget(self, budget: int):
+        """Sets the byte budget for the cache, evicting entries as needed"""
+        with self._lock:
+            self._budget = budget
+            self._fixed_budget = True
+            self._evict()
+
+    @property
+    def size(self) -> int:
+        """The number of decompressed bytes currently held by the cache"""
+        return self._size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def cache_clear(self):
+        """Clears the cache and works out its budget from the settings again"""
+        with self._lock:
+            self.clear()
+            if not self._fixed_budget:
+                self._budget = None
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "bytes": self._size,
+            "settings": sorted(self.settings),
+        }
+
+    def _evict(self):
+        while self._entries and self._size > self.budget:
+            _, (data, _, _) = self._entries.popitem(last=False)
+            self._size -= len(data)
+
+    def _load(self, key: tuple, data: bytes) -> "SarcTable":
+        data = unyaz_if_needed(data)
+        sarc = oead.Sarc(data)
+        table = SarcTable({f.name: f.data for f in sarc.get_files()})
+        table.data, table.sarc = data, sarc
+        self.misses += 1
+        if len(data) <= self.budget:
+            self._entries[key] = (data, sarc, table)
+            self._size += len(data)
+            self._evict()
+        return table
+
+    def get_table(self, path: Path, chain: Tuple[str, ...] = ()) -> "SarcTable":
+        """
+        Gets the file table of a SARC, optionally nested inside other SARCs
+
+        :param path: The path to the outermost SARC file on disk
+        :param chain: The names of the nested SARCs to descend into, in order
+        :return: A dict of file names to views of their data
+        """
+        stat = path.stat()
+        base_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            for i in range(len(chain), -1, -1):
+                key = base_key + (chain[:i],)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    table = self._entries[key][2]
+                    break
+            else:
+                i = 0
+                table = self._load(base_key + ((),), path.read_bytes())
+            for j in range(i, len(chain)):
+                try:
+                    data = table[chain[j]]
+                except KeyError as err:
+                    raise FileNotFoundError(
+                        f"{chain[j]} not found in {path}//{'//'.join(chain[:j])}"
+                    ) from err
+                table = self._load(base_key + (chain[: j + 1],), data)
+            return table
+
+
+SARC_CACHE = CACHES.register(SarcCache())
+
+
 def get_nested_file_bytes(file: str, unyaz: bool = True) -> bytes:
     nests = file.split("//")
-    sarcs = []
-    sarcs.append(oead.Sarc(unyaz_if_needed(Path(nests[0]).read_bytes())))
-    i = 1
-    while i < len(nests) - 1:
-        sarc_bytes = unyaz_if_needed(sarcs[i - 1].get_file(nests[i]).data)
-        sarcs.append(oead.Sarc(sarc_bytes))
-        i += 1
-    file_bytes = sarcs[-1].get_file(nests[-1]).data
+    table = SARC_CACHE.get_table(Path(nests[0]), tuple(nests[1:-1]))
+    try:
+        file_bytes = table[nests[-1]]
+    except KeyError as err:
+        raise FileNotFoundError(f"{nests[-1]} not found in {file}") from err
     if file_bytes[0:4] == b"Yaz0" and unyaz:
-        file_bytes = decompress(file_bytes)
-    else:
-        file_bytes = bytes(file_bytes)
-    del sarcs
-    return file_bytes
+        return bytes(decompress(file_bytes))
+    return bytes(file_bytes)
 
 
-@lru_cache(None)
+@cached("store_dir", "wiiu")
 def get_master_modpack_dir() -> Path:
     master = get_modpack_dir() / "9999_BCML"
     if not (master / "rules.txt").exists():
@@ -1007,7 +2043,7 @@ def get_master_modpack_dir() -> Path:
     return master
 
 
-@lru_cache(1)
+@cached("store_dir", "wiiu", maxsize=1)
 def get_merged_modpack_dir() -> Path:
     if get_settings("wiiu"):
         return get_storage_dir() / "merged"
@@ -1015,7 +2051,7 @@ def get_merged_modpack_dir() -> Path:
         return get_storage_dir() / "merged_nx"
 
 
-@lru_cache(2)
+@cached(maxsize=2)
 def get_hash_table(wiiu: bool = True) -> Dict[str, List[int]]:
     return json.loads(
         decompress(
@@ -1029,7 +2065,7 @@ def get_hash_table(wiiu: bool = True) -> Dict[str, List[int]]:
     )
 
 
-@lru_cache(None)
+@cached()
 def get_canon_name(file: Union[str, Path], allow_no_source: bool = False) -> str:
     if isinstance(file, str):
         file = Path(file)
@@ -1059,7 +2095,7 @@ def get_canon_name(file: Union[str, Path], allow_no_source: bool = False) -> str
     return name
 
 
-@lru_cache(None)
+@cached()
 def get_mod_id(mod_name: str, priority: int) -> str:
     return f"{priority:04}_" + get_safe_pathname(mod_name)
 
@@ -1075,7 +2111,7 @@ def get_mod_by_priority(priority: int) -> Union[Path, bool]:
         return False
 
 
-@lru_cache(None)
+@cached()
 def get_file_language(file: Union[Path, str]) -> str:
     if isinstance(file, Path):
         file = str(file)
@@ -1086,27 +2122,136 @@ def get_file_language(file: Union[Path, str]) -> str:
         raise ValueError(f"File {file} does not have a language specifier in its path")
 
 
-def is_file_modded(name: str, file: Union[bytes, Path], count_new: bool = True) -> bool:
+def get_decompressed_size(data: ByteString) -> int:
+    """Gets the size of some data once decompressed, reading only its Yaz0 header"""
+    if data[0:4] == b"Yaz0":
+        return int.from_bytes(data[4:8], "big")
+    return len(data)
+
+
+@contextmanager
+def map_file(file: Path) -> Iterator[ByteString]:
+    """Maps a file into memory read-only, so it can be hashed without copying it"""
+    with file.open("rb") as stream:
+        try:
+            mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            yield b""
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+class StockSizeCache:
+    """
+    The decompressed sizes of stock files which have only one stock version, read
+    from the Yaz0 headers of their copies in the game dump or learnt from files found
+    to match them. A file of any other size is modified, without hashing it.
+    """
+
+    name = "stock_sizes"
+    settings = frozenset(GAME_SETTINGS)
+    _sizes: Dict[str, int]
+
+    def __init__(self):
+        self._sizes = {}
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, game_file: Optional[Path] = None) -> Optional[int]:
+        """Gets a file's stock size, reading it from its game dump copy if needed"""
+        with self._lock:
+            size = self._sizes.get(name)
+            if size is not None:
+                self.hits += 1
+                return size
+            self.misses += 1
+        if not game_file:
+            return None
+        try:
+            with game_file.open("rb") as stream:
+                header = stream.read(8)
+            size = (
+                get_decompressed_size(header)
+                if header[0:4] == b"Yaz0"
+                else game_file.stat().st_size
+            )
+        except OSError:
+            return None
+        self.remember(name, size)
+        return size
+
+    def remember(self, name: str, size: int):
+        """Records the size of a file found to match its only stock version"""
+        with self._lock:
+            self._sizes.setdefault(name, size)
+
+    def cache_clear(self):
+        with self._lock:
+            self._sizes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._sizes),
+            "settings": sorted(self.settings),
+        }
+
+
+STOCK_SIZES = CACHES.register(StockSizeCache())
+
+
+def is_file_modded(
+    name: str,
+    file: Union[bytes, Path],
+    count_new: bool = True,
+    game_file: Optional[Path] = None,
+) -> bool:
+    """
+    Checks whether a file differs from every stock version of it. For a file with only
+    one stock version, a decompressed size different from that version's proves it
+    modified without hashing. The stock size comes from the Yaz0 header of the copy in
+    the game dump, if its path is given, or from a matching file seen earlier.
+    """
     table = get_hash_table(get_settings("wiiu"))
     if name not in table:
         return count_new
-    contents = (
-        file
-        if isinstance(file, bytes)
-        else file.read_bytes()
-        if isinstance(file, Path)
-        else bytes(file)
-    )
+    if isinstance(file, Path):
+        with map_file(file) as contents:
+            return _is_data_modded(name, contents, table[name], game_file)
+    if not isinstance(file, bytes):
+        try:
+            file = memoryview(file)
+        except TypeError:
+            file = bytes(file)
+    return _is_data_modded(name, file, table[name], game_file)
+
+
+def _is_data_modded(
+    name: str, contents: ByteString, hashes: List[int], game_file: Optional[Path]
+) -> bool:
+    size = get_decompressed_size(contents)
+    if len(hashes) == 1:
+        stock_size = STOCK_SIZES.get(name, game_file)
+        if stock_size is not None and stock_size != size:
+            return True
     if contents[0:4] == b"Yaz0":
         try:
             contents = decompress(contents)
         except RuntimeError as err:
             raise ValueError(f"Invalid yaz0 file {name}") from err
-    fhash = xxhash.xxh64_intdigest(contents)
-    return not fhash in table[name]
+    if xxhash.xxh64_intdigest(contents) not in hashes:
+        return True
+    if len(hashes) == 1:
+        STOCK_SIZES.remember(name, size)
+    return False
 
 
-@lru_cache(None)
+@cached()
 def is_file_sarc(path: str) -> bool:
     ext = os.path.splitext(str(path))[1]
     return ext in SARC_EXTS
@@ -1194,7 +2339,7 @@ def inject_files_into_actor(actor: str, files: Dict[str, ByteString]):
         output.write_bytes(out_bytes)
 
 
-@lru_cache(None)
+@cached()
 def get_mod_preview(mod: BcmlMod) -> Path:
     if mod.url:
         url = mod.url
@@ -1235,6 +2380,99 @@ def get_mod_preview(mod: BcmlMod) -> Path:
     return mod.path / image_path
 
 
+THUMBNAIL_SIZE = 512
+
+
+def get_thumbnail_dir() -> Path:
+    return get_storage_dir() / "thumbnails"
+
+
+def _get_preview_key(preview: Path) -> str:
+    stat = preview.stat()
+    return _hash_preview(preview, stat.st_size, stat.st_mtime_ns)
+
+
+@cached()
+def _hash_preview(preview: Path, size: int, mtime: int) -> str:
+    # thumbnails are named for the preview's contents, so they survive mods being
+    # reordered and mods with the same image share one
+    return xxhash.xxh64_hexdigest(preview.read_bytes())
+
+
+def _get_local_preview(mod: BcmlMod) -> Optional[Path]:
+    for thumb in mod.path.glob("thumbnail.*"):
+        return thumb
+    image = mod._info.get("image", "")  # pylint: disable=protected-access
+    if image and not image.startswith("http") and (mod.path / image).is_file():
+        return mod.path / image
+    return None
+
+
+def prune_thumbnails():
+    """Deletes cached thumbnails which no installed mod's preview uses any more"""
+    thumb_dir = get_thumbnail_dir()
+    if not thumb_dir.exists():
+        return
+    keys = set()
+    for mod in get_installed_mods(disabled=True):
+        preview = _get_local_preview(mod)
+        if preview:
+            keys.add(_get_preview_key(preview))
+    for thumb in thumb_dir.iterdir():
+        if thumb.name.split(".")[0] not in keys:
+            try:
+                thumb.unlink()
+            except OSError:
+                pass
+
+
+def get_mod_thumbnail(mod: BcmlMod) -> Path:
+    """
+    Gets a downscaled copy of a mod's preview image from the thumbnail cache, creating
+    it (and fetching the preview, if it is remote) the first time. Without Pillow the
+    preview is cached as it is.
+    """
+    preview = mod.get_preview()
+    key = _get_preview_key(preview)
+    thumb_dir = get_thumbnail_dir()
+    if thumb_dir.exists():
+        for thumb in thumb_dir.iterdir():
+            if thumb.name.split(".")[0] == key and thumb.suffix != ".tmp":
+                return thumb
+
+    data = preview.read_bytes()
+    ext = ".jpg" if preview.suffix in {".jfif", ".jpeg"} else preview.suffix
+    try:
+        # pylint: disable=import-outside-toplevel
+        from PIL import Image  # type: ignore
+
+        with Image.open(preview) as image:
+            image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            buffer = BytesIO()
+            image.save(buffer, "PNG", optimize=True)
+            data, ext = buffer.getvalue(), ".png"
+    except (ImportError, OSError, ValueError):
+        pass
+
+    thumb_dir.mkdir(parents=True, exist_ok=True)
+    thumb = thumb_dir / f"{key}{ext or '.png'}"
+    replace_file(thumb, data)
+    return thumb
+
+
+def prefetch_thumbnail(mod: BcmlMod):
+    """Fetches and caches a mod's thumbnail in the background"""
+
+    def fetch():
+        try:
+            get_mod_thumbnail(mod)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    if mod.has_preview():
+        Thread(target=fetch, daemon=True).start()
+
+
 def get_mod_link_meta(mod: BcmlMod):
     # pylint: disable=too-many-branches
     url = mod.url
@@ -1356,6 +2594,8 @@ def create_shortcuts(desktop: bool, start_menu: bool):
 
 
 def download_webview2():
+    # pylint: disable=import-outside-toplevel
+    import requests
     from bcml import native_msg
 
     native_msg(
@@ -1486,8 +2726,12 @@ def get_open_port():
     return port
 
 
-@lru_cache(1)
+@cached(maxsize=1)
 def get_latest_bcml() -> str:
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from xml.dom import minidom
+
     try:
         res = requests.get("https://pypi.org/rss/project/bcml/releases.xml")
         doc = minidom.parseString(res.text)
@@ -1544,34 +2788,93 @@ class MergeError(Exception):
 
 
 class Messager:
-    def __init__(self, window: Window):
+    """
+    Collects BCML's output for the log file. Lines are appended to bcml.log by a
+    background thread, which rotates the file once it grows past ``max_bytes``, and
+    only the most recent lines are kept in memory for error reports.
+    """
+
+    def __init__(
+        self,
+        window: "Window",
+        log_file: Optional[Path] = None,
+        max_bytes: int = 8 * 1024 * 1024,
+        backups: int = 3,
+        ring_size: int = 1000,
+    ):
         self.window = window
-        self.log_file = get_data_dir() / "bcml.log"
-        self.log: List[str] = []
-        self.i = 0
+        self.log_file = log_file or get_data_dir() / "bcml.log"
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.log: Deque[str] = deque(maxlen=ring_size)
+        self._partial = ""
+        self._queue: Queue = Queue()
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        if self.log_file.exists() and self.log_file.stat().st_size:
+            self._rotate()
+        self._writer = Thread(target=self._write_loop, name="bcml-log", daemon=True)
+        self._writer.start()
 
     def write(self, s: str):
         stripped = s.replace("VERBOSE", "")
-        self.log.append(stripped)
-        self.i += 1
-        if self.i == 256:
-            self.save()
-            self.i = 0
+        self._queue.put(stripped)
+        lines = (self._partial + stripped).split("\n")
+        self._partial = lines.pop()
+        self.log.extend(lines)
         if DEBUG:
             sys.__stdout__.write(stripped)
 
     def isatty(self):  # pylint: disable=no-self-use
         return False
 
+    def get_recent(self, count: int = 100) -> List[str]:
+        """Gets the most recent lines of output, oldest first"""
+        lines = list(self.log) + ([self._partial] if self._partial else [])
+        return lines[-count:]
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            old = self.log_file.with_name(f"{self.log_file.name}.{i}")
+            if old.exists():
+                os.replace(old, self.log_file.with_name(f"{self.log_file.name}.{i + 1}"))
+        if self.backups:
+            os.replace(self.log_file, self.log_file.with_name(f"{self.log_file.name}.1"))
+        else:
+            self.log_file.unlink()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                with self.log_file.open("a", encoding="utf-8") as log:
+                    log.write("".join(b for b in batch if b is not None))
+                    rotate = log.tell() > self.max_bytes
+                if rotate:
+                    self._rotate()
+            except OSError:
+                pass
+            for _ in batch:
+                self._queue.task_done()
+            if None in batch:
+                return
+
     def save(self):
-        self.log_file.write_text("\n".join(self.log))
+        """Waits until everything written so far is in the log file"""
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(5)
 
     def __del__(self):
-        self.save()
-        del self.log
+        self.close()
 
 
-@lru_cache(1)
+@cached(maxsize=1)
 def get_7z_path():
     if system() == "Windows":
         return str(get_exec_dir() / "helpers" / "7z.exe")
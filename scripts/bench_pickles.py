@@ -0,0 +1,150 @@
+"""
+Compares the two ways BCML can hand large oead documents to pool workers. Pickling
+serialises, copies and parses each document again for every task. Shared payloads
+(``pickles.SharedPayloads``) are serialised into shared memory once, after which each
+task only receives a handle and parses straight from the shared block.
+
+It builds stock-sized gamedata flag arrays and an AAMP document in memory, and sends
+every one to the workers once per round, as installing several mods on one pool does
+with the stock gamedata. The best time of a few runs is reported for each transport.
+
+Usage: python scripts/bench_pickles.py [--flags N] [--objects N] [--rounds N]
+                                       [--workers N] [--runs N]
+"""
+# Licensed under GPLv3+
+import argparse
+import multiprocessing
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import oead  # pylint: disable=wrong-import-position
+from bcml import pickles  # pylint: disable=wrong-import-position
+
+# Rough shares of each type among the stock gamedata flags
+GAMEDATA_TYPES = {
+    "bool_data": 0.6,
+    "s32_data": 0.2,
+    "f32_data": 0.05,
+    "string32_data": 0.05,
+    "vector3f_data": 0.1,
+}
+
+
+def make_gamedata(flags: int) -> Dict[str, oead.byml.Array]:
+    """Builds gamedata flag arrays shaped like the stock ones"""
+    init_values = {
+        "bool_data": lambda i: bool(i % 2),
+        "s32_data": oead.S32,
+        "f32_data": lambda i: oead.F32(float(i)),
+        "string32_data": lambda i: f"Value_{i}",
+        "vector3f_data": lambda i: oead.byml.Array([oead.F32(float(i))] * 3),
+    }
+    gamedata = {}
+    for data_type, share in GAMEDATA_TYPES.items():
+        gamedata[data_type] = oead.byml.Array(
+            [
+                oead.byml.Hash(
+                    {
+                        "DataName": f"{data_type}_Flag_{i:05}",
+                        "DeleteRev": oead.S32(-1),
+                        "HashValue": oead.S32(i),
+                        "InitValue": init_values[data_type](i),
+                        "IsEventAssociated": False,
+                        "IsOneTrigger": False,
+                        "IsProgramReadable": True,
+                        "IsProgramWritable": True,
+                        "IsSave": bool(i % 3),
+                        "ResetType": oead.S32(i % 4),
+                    }
+                )
+                for i in range(int(flags * share))
+            ]
+        )
+    return gamedata
+
+
+def make_aamp(objects: int) -> oead.aamp.ParameterIO:
+    """Builds an AAMP document with many small parameter objects"""
+    pio = oead.aamp.ParameterIO()
+    for i in range(objects):
+        obj = oead.aamp.ParameterObject()
+        obj.params["Name"] = oead.aamp.Parameter(oead.FixedSafeString64(f"Actor_{i}"))
+        obj.params["Value"] = oead.aamp.Parameter(float(i))
+        obj.params["Enabled"] = oead.aamp.Parameter(bool(i % 2))
+        pio.objects[f"Object_{i}"] = obj
+    return pio
+
+
+def count_items(doc) -> int:
+    """The worker task: gets the document and does a trivial amount of work on it"""
+    doc = pickles.unwrap(doc)
+    if isinstance(doc, oead.aamp.ParameterIO):
+        return len(doc.objects)
+    return len(doc)
+
+
+def run_pickled(pool, docs: list, rounds: int) -> List[int]:
+    results = []
+    for _ in range(rounds):
+        results = pool.map(count_items, docs, chunksize=1)
+    return results
+
+
+def run_shared(pool, docs: list, rounds: int) -> List[int]:
+    results = []
+    with pickles.SharedPayloads() as shared:
+        for _ in range(rounds):
+            handles = [
+                shared.put(i, lambda doc=doc: doc) for i, doc in enumerate(docs)
+            ]
+            results = pool.map(count_items, handles, chunksize=1)
+    return results
+
+
+def best_time(func: Callable, runs: int, *args) -> float:
+    times = []
+    for _ in range(runs):
+        start = perf_counter()
+        func(*args)
+        times.append(perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare pickling and shared memory for sending oead documents"
+    )
+    parser.add_argument("--flags", type=int, default=30000, help="Gamedata flags")
+    parser.add_argument("--objects", type=int, default=20000, help="AAMP objects")
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="Times each document is sent"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--runs", type=int, default=3, help="Runs, best is kept")
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method("spawn", True)
+    gamedata = make_gamedata(args.flags)
+    cases = {
+        "gamedata": list(gamedata.values()),
+        "aamp": [make_aamp(args.objects)],
+    }
+    with multiprocessing.Pool(args.workers) as pool:
+        pool.map(count_items, [oead.byml.Array()] * args.workers)  # start workers
+        for name, docs in cases.items():
+            if run_pickled(pool, docs, 1) != run_shared(pool, docs, 1):
+                raise RuntimeError(f"The transports disagree on the {name} case")
+            pickled = best_time(run_pickled, args.runs, pool, docs, args.rounds)
+            shared = best_time(run_shared, args.runs, pool, docs, args.rounds)
+            print(
+                f"{name:<10} pickle {pickled:9.1f} ms   shared {shared:9.1f} ms   "
+                f"({pickled / shared:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
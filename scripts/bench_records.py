@@ -0,0 +1,159 @@
+"""
+Compares the keyed record helpers used by the quest, dungeon static and area data
+mergers with the list scans they replaced. ``mergers.diff_keyed_records`` looks
+stock records up through ``mergers.index_records`` instead of searching the list of
+names for each modded record, and ``quests.insert_quests`` inserts added quests
+through a linked list instead of rebuilding the list of names for every insertion.
+
+It builds a synthetic quest list, a modded copy with some quests changed, deleted
+and added, and times diffing the two and inserting the added quests each way. The
+results of both are checked to agree, and the best time of a few runs is reported.
+
+Usage: python scripts/bench_records.py [--stock N] [--modified N] [--deleted N]
+                                       [--added N] [--runs N]
+"""
+# Licensed under GPLv3+
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import oead  # pylint: disable=wrong-import-position
+from bcml import mergers  # pylint: disable=wrong-import-position
+from bcml.mergers.quests import (  # pylint: disable=wrong-import-position
+    get_quest_name,
+    insert_quests,
+)
+
+
+def make_quest(name: str, value: int) -> oead.byml.Hash:
+    return oead.byml.Hash(
+        {
+            "Name": name,
+            "Category": oead.S32(value % 4),
+            "QuestFlag": f"{name}_Flag",
+            "Value": oead.S32(value),
+        }
+    )
+
+
+def make_quests(args) -> tuple:
+    """Builds the stock quests and a modded list, with each added quest anchored"""
+    stock = oead.byml.Array(make_quest(f"Quest_{i:05}", i) for i in range(args.stock))
+    modded = oead.byml.Array(
+        make_quest(f"Quest_{i:05}", i + 1 if i < args.modified else i)
+        for i in range(args.deleted, args.stock)
+    )
+    for i in range(args.added):
+        # spread the new quests through the list, after stock and added quests alike
+        modded.insert((i * 7919) % (len(modded) + 1), make_quest(f"Added_{i:05}", i))
+    return stock, modded
+
+
+def anchor_adds(modded: oead.byml.Array, added: List) -> List[oead.byml.Hash]:
+    """Marks each added quest with the quest before it, as quest diffs do"""
+    previous = {}
+    for i, quest in enumerate(modded):
+        previous[get_quest_name(quest)] = (
+            get_quest_name(modded[i - 1]) if i > 0 else "--index_zero"
+        )
+    adds = []
+    for quest in added:
+        add = oead.byml.Hash(quest)
+        add["prev_quest"] = previous[get_quest_name(quest)]
+        adds.append(add)
+    return adds
+
+
+def diff_scanned(stock, modded) -> tuple:
+    stock_names = [q["Name"] for q in stock]
+    mod_names = [q["Name"] for q in modded]
+    added, modified = [], {}
+    for quest in modded:
+        name = quest["Name"]
+        if name not in stock_names:
+            added.append(quest)
+        elif quest != stock[stock_names.index(name)]:
+            modified[name] = quest
+    deleted = [q for q in stock_names if q not in mod_names]
+    return added, modified, deleted
+
+
+def diff_indexed(stock, modded) -> tuple:
+    return mergers.diff_keyed_records(stock, modded, get_quest_name)
+
+
+def insert_scanned(quests, adds) -> list:
+    quests = list(quests)
+    added_names = set()
+    for add in adds:
+        if add["Name"] in added_names:
+            continue
+        add = oead.byml.Hash(add)
+        prev_quest = add["prev_quest"]
+        del add["prev_quest"]
+        names = [q["Name"] for q in quests]
+        if prev_quest == "--index_zero":
+            quest_index = 0
+        elif prev_quest in names:
+            quest_index = names.index(prev_quest) + 1
+        else:
+            quest_index = len(quests)
+        quests.insert(quest_index, add)
+        added_names.add(add["Name"])
+    return quests
+
+
+def insert_linked(quests, adds) -> list:
+    # insert_quests takes the anchors off the added quests, so give it copies
+    return list(insert_quests(quests, [oead.byml.Hash(add) for add in adds]))
+
+
+def best_time(func: Callable, runs: int, *args) -> float:
+    times = []
+    for _ in range(runs):
+        start = perf_counter()
+        func(*args)
+        times.append(perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare keyed record diffs and quest inserts with list scans"
+    )
+    parser.add_argument("--stock", type=int, default=2000, help="Stock quests")
+    parser.add_argument("--modified", type=int, default=500, help="Modified quests")
+    parser.add_argument("--deleted", type=int, default=100, help="Deleted quests")
+    parser.add_argument("--added", type=int, default=1000, help="Added quests")
+    parser.add_argument("--runs", type=int, default=5, help="Runs, best is kept")
+    args = parser.parse_args()
+
+    stock, modded = make_quests(args)
+    if diff_scanned(stock, modded) != tuple(diff_indexed(stock, modded)):
+        raise RuntimeError("The diffs disagree")
+    added = diff_indexed(stock, modded)[0]
+    adds = anchor_adds(modded, added)
+    kept_names = {get_quest_name(q) for q in modded}
+    kept = [q for q in stock if get_quest_name(q) in kept_names]
+    if insert_scanned(kept, adds) != insert_linked(kept, adds):
+        raise RuntimeError("The inserts disagree")
+
+    cases = {
+        "diff": (diff_scanned, diff_indexed, stock, modded),
+        "insert": (insert_scanned, insert_linked, kept, adds),
+    }
+    for name, (scanned, keyed, *inputs) in cases.items():
+        scanned_time = best_time(scanned, args.runs, *inputs)
+        keyed_time = best_time(keyed, args.runs, *inputs)
+        print(
+            f"{name:<8} list scan {scanned_time:9.1f} ms   "
+            f"keyed {keyed_time:9.1f} ms   ({scanned_time / keyed_time:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Measures BCML's start-up time: how long importing its core modules takes, per
+``python -X importtime``, and how long ``bcml.__main__.main`` takes to get to the
+point of showing its window. Each is run in a fresh interpreter a few times and the
+best time is reported. With ``--max-import-ms`` or ``--max-window-ms``, it exits
+with an error if a time is over budget, so it can be used to catch regressions.
+
+Usage: python scripts/bench_startup.py [--runs N] [--max-import-ms MS]
+                                       [--max-window-ms MS] [--no-window]
+"""
+# Licensed under GPLv3+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules which every BCML process, including each pool worker, imports
+CORE_MODULES = ["bcml.util", "bcml.mergers"]
+
+# Modules which only the GUI or network features need, so should not be imported
+# by the core modules
+DEFERRED_MODULES = ["webview", "requests", "xml.dom.minidom"]
+
+# Runs main() with webview.start replaced, so that it reports how long it took to
+# get there and returns instead of opening the window
+WINDOW_DRIVER = """
+import sys, time
+start = time.perf_counter()
+import webview
+
+def start_gui(*args, **kwargs):
+    print(f"window {(time.perf_counter() - start) * 1000:.1f}", flush=True)
+
+webview.start = start_gui
+from bcml.__main__ import main
+main()
+"""
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=300,
+    )
+
+
+def measure_imports() -> Tuple[float, Dict[str, float]]:
+    """
+    Imports the core modules in a fresh interpreter and returns the total import
+    time in ms, along with the cumulative time of each top-level package imported
+    """
+    result = _run(
+        ["-X", "importtime", "-c", "; ".join(f"import {m}" for m in CORE_MODULES)]
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not import BCML:\n{result.stderr}")
+    packages: Dict[str, float] = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            cumulative_us = int(cumulative)
+        except ValueError:
+            continue  # the header line
+        # nested imports are indented under the module which imported them
+        if name.startswith("  "):
+            continue
+        name = name.strip()
+        total += cumulative_us
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + cumulative_us / 1000
+    return total / 1000, packages
+
+
+def find_deferred_imports() -> List[str]:
+    """Lists the deferred modules which importing the core modules loads anyway"""
+    check = (
+        "import sys; "
+        + "; ".join(f"import {m}" for m in CORE_MODULES)
+        + f"; print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = _run(["-c", check])
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not import BCML:\n{result.stderr}")
+    return result.stdout.split()
+
+
+def measure_window() -> float:
+    """Returns the ms from starting the interpreter to main() opening its window"""
+    result = _run(["-c", WINDOW_DRIVER])
+    for line in result.stdout.splitlines():
+        if line.startswith("window "):
+            return float(line.split()[1])
+    raise RuntimeError(f"BCML did not get to opening its window:\n{result.stderr}")
+
+
+def _check(label: str, value: float, budget: Optional[float]) -> bool:
+    over = budget is not None and value > budget
+    limit = f" (budget {budget:.0f} ms{', OVER' if over else ''})" if budget else ""
+    print(f"{label}: {value:.1f} ms{limit}")
+    return not over
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure BCML's start-up time")
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Runs of each measurement, best is kept"
+    )
+    parser.add_argument(
+        "--max-import-ms", type=float, help="Fail if importing takes longer than this"
+    )
+    parser.add_argument(
+        "--max-window-ms",
+        type=float,
+        help="Fail if getting to the window takes longer than this",
+    )
+    parser.add_argument(
+        "--no-window",
+        action="store_true",
+        help="Only measure imports, e.g. where there is no display",
+    )
+    args = parser.parse_args()
+
+    passed = True
+    runs = [measure_imports() for _ in range(max(1, args.runs))]
+    total, packages = min(runs, key=lambda run: run[0])
+    print("Slowest packages imported:")
+    for package, time in sorted(packages.items(), key=lambda p: -p[1])[:10]:
+        print(f"  {package:<20} {time:8.1f} ms")
+    passed &= _check("Import time", total, args.max_import_ms)
+
+    deferred = find_deferred_imports()
+    if deferred:
+        print(f"Imported at start-up, not on first use: {', '.join(deferred)}")
+        passed = False
+
+    if not args.no_window:
+        window = min(measure_window() for _ in range(max(1, args.runs)))
+        passed &= _check("Time to window", window, args.max_window_ms)
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@ setup(
         "gui_scripts": ["bcml = bcml.__main__:main"],
         "console_scripts": [
             "bcml-debug = bcml.__main__:main_debug",
+            "bcml-cli = bcml.cli:main",
         ],
     },
     classifiers=[
@@ -13,15 +13,19 @@ use rayon::prelude::*;
 use roead::sarc::Sarc;
 use std::{
     borrow::Cow,
+    collections::HashMap,
     path::{Path, PathBuf},
 };
+use xxhash_rust::xxh64::xxh64;
 
 #[pymodule]
 fn bcml(py: Python, m: &PyModule) -> PyResult<()> {
     mergers::mergers_mod(py, m)?;
     manager::manager_mod(py, m)?;
     m.add_wrapped(wrap_pyfunction!(find_modified_files))?;
+    m.add_wrapped(wrap_pyfunction!(find_modified_files_in))?;
     m.add_wrapped(wrap_pyfunction!(reload_settings))?;
+    m.add_wrapped(wrap_pyfunction!(set_settings))?;
     Ok(())
 }
 
@@ -32,30 +36,81 @@ fn reload_settings() -> PyResult<()> {
     Ok(())
 }
 
+/// Replaces the settings with a JSON snapshot from Python, so that temporary
+/// settings and pool workers do not have to go through the settings file.
+#[pyfunction]
+fn set_settings(settings: String) -> PyResult<()> {
+    let settings: settings::Settings =
+        serde_json::from_str(&settings.cow_replace(": null", ": \"\""))
+            .map_err(anyhow::Error::from)?;
+    *settings::SETTINGS.write() = settings;
+    Ok(())
+}
+
 #[pyfunction]
 fn find_modified_files(py: Python, mod_dir: String) -> PyResult<Vec<String>> {
     println!("Finding modified files...");
     let mod_dir = Path::new(&mod_dir);
-    let content = mod_dir.join(util::content());
-    let dlc = mod_dir.join(util::dlc());
     let files: Vec<PathBuf> = py.allow_threads(|| {
         glob::glob(&mod_dir.join("**/*").to_string_lossy())
             .expect("Bad glob?!?!?!")
             .filter_map(std::result::Result::ok)
-            .par_bridge()
-            .filter(|f| {
-                f.is_file()
-                    && (f.starts_with(&content) || f.starts_with(&dlc))
-                    && util::get_canon_name(unsafe { f.strip_prefix(mod_dir).unwrap_unchecked() })
-                        .and_then(|canon| {
-                            fs::read(f)
-                                .ok()
-                                .map(|data| util::is_file_modded(&canon, &data))
-                        })
-                        .unwrap_or(false)
+            .collect()
+    });
+    scan_modified_files(py, mod_dir, files).map(|(modified, _)| modified)
+}
+
+/// Like `find_modified_files`, but only checks the given files (relative to the mod
+/// folder), for rescans where most of the mod is known to be unchanged. Also returns
+/// the xxh64 hash of each file read, keyed by its relative path, so that the caller
+/// does not have to read the files again to index them.
+#[pyfunction]
+fn find_modified_files_in(
+    py: Python,
+    mod_dir: String,
+    files: Vec<String>,
+) -> PyResult<(Vec<String>, HashMap<String, String>)> {
+    println!("Finding modified files...");
+    let mod_dir = Path::new(&mod_dir);
+    let files = files.into_iter().map(|f| mod_dir.join(f)).collect();
+    scan_modified_files(py, mod_dir, files)
+}
+
+fn scan_modified_files(
+    py: Python,
+    mod_dir: &Path,
+    files: Vec<PathBuf>,
+) -> PyResult<(Vec<String>, HashMap<String, String>)> {
+    let content = mod_dir.join(util::content());
+    let dlc = mod_dir.join(util::dlc());
+    let scanned: Vec<(PathBuf, String, bool)> = py.allow_threads(|| {
+        files
+            .into_par_iter()
+            .filter(|f| f.is_file() && (f.starts_with(&content) || f.starts_with(&dlc)))
+            .filter_map(|f| {
+                let data = fs::read(&f).ok()?;
+                let modded =
+                    util::get_canon_name(unsafe { f.strip_prefix(mod_dir).unwrap_unchecked() })
+                        .map(|canon| util::is_file_modded(&canon, &data))
+                        .unwrap_or(false);
+                let hash = format!("{:016x}", xxh64(&data, 0));
+                Some((f, hash, modded))
             })
             .collect()
     });
+    let hashes: HashMap<String, String> = scanned
+        .iter()
+        .map(|(f, hash, _)| {
+            (
+                unsafe { f.strip_prefix(mod_dir).unwrap_unchecked() }.to_slash_lossy(),
+                hash.clone(),
+            )
+        })
+        .collect();
+    let files: Vec<PathBuf> = scanned
+        .into_iter()
+        .filter_map(|(f, _, modded)| modded.then_some(f))
+        .collect();
     println!("Found {} modified files...", files.len());
     let sarc_files: Vec<String> = py.allow_threads(|| -> Result<Vec<String>> {
         Ok(files
@@ -81,11 +136,14 @@ fn find_modified_files(py: Python, mod_dir: String) -> PyResult<Vec<String>> {
             .collect())
     })?;
     println!("Found {} modified files in SARCs...", sarc_files.len());
-    Ok(files
-        .into_par_iter()
-        .map(|file| file.to_slash_lossy())
-        .chain(sarc_files.into_par_iter())
-        .collect())
+    Ok((
+        files
+            .into_par_iter()
+            .map(|file| file.to_slash_lossy())
+            .chain(sarc_files.into_par_iter())
+            .collect(),
+        hashes,
+    ))
 }
 
 fn find_modded_sarc_files(sarc: &Sarc, aoc: bool, path: &str) -> Result<Vec<String>> {
@@ -140,10 +140,6 @@ impl Settings {
         DATA_DIR.join("settings.json")
     }
 
-    pub fn tmp_path() -> PathBuf {
-        DATA_DIR.join("tmp_settings.json")
-    }
-
     pub fn base_game_dir(&self) -> &Path {
         if self.wiiu {
             &self.game_dir
@@ -259,18 +255,6 @@ pub static SETTINGS: Lazy<Arc<RwLock<Settings>>> = Lazy::new(|| {
     }))
 });
 
-pub static TMP_SETTINGS: Lazy<Arc<RwLock<Settings>>> = Lazy::new(|| {
-    let settings_path = Settings::tmp_path();
-    Arc::new(RwLock::new(if settings_path.exists() {
-        let text = fs::read_to_string(&settings_path).expect("Chouldn't read settings, that's bad");
-        serde_json::from_str(&text.cow_replace(": null", ": \"\""))
-            .expect("Failed to read temp settings file")
-    } else {
-        println!("WARNING: Temp settings file does not exist, loading default settings...");
-        Settings::default()
-    }))
-});
-
 pub static DATA_DIR: Lazy<PathBuf> = Lazy::new(|| {
     if std::env::args().any(|f| &f == "--portable") {
         std::env::current_dir()
@@ -20,11 +20,7 @@ static STOCK_PACKS: Lazy<Mutex<HashMap<PathBuf, Arc<Sarc<'static>>>>> =
 
 #[inline(always)]
 pub fn settings() -> RwLockReadGuard<'static, crate::settings::Settings> {
-    if crate::settings::Settings::tmp_path().exists() {
-        crate::settings::TMP_SETTINGS.read()
-    } else {
-        crate::settings::SETTINGS.read()
-    }
+    crate::settings::SETTINGS.read()
 }
 
 #[inline]